@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from transpiler.batch import *
+
+
+class BatchTesting(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'queue.db')
+        self.output = os.path.join(self.directory.name, 'out')
+        self.inputs = ['tests/testfiles/' + name for name in sorted(os.listdir('tests/testfiles'))
+                       if name.endswith('.py')]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_workers(self):
+        queue = JobQueue(self.path)
+        self.assertEqual(queue.add(self.inputs, self.output), len(self.inputs))
+        self.assertEqual(queue.add(self.inputs, self.output), 0)
+        with multiprocessing.Pool(3) as pool:
+            processed = pool.starmap(work, [(self.path,)] * 3)
+        self.assertEqual(sum(processed), len(self.inputs))
+        report = queue.report()
+        self.assertEqual(report['done'] + report['failed'], len(self.inputs))
+        self.assertEqual(report['errors'], [
+            (os.path.abspath('tests/testfiles/syntax_error.py'), 'syntax error: token PLUS, line 1'),
+            (os.path.abspath('tests/testfiles/undefined_token_error.py'), 'lexical error: line 2')])
+        with open(os.path.join(self.output, 'complex1.cpp')) as f:
+            with open('tests/testfiles/complex1.cpp') as expected:
+                self.assertEqual(f.read(), expected.read())
+        queue.close()
+
+    def test_resume(self):
+        queue = JobQueue(self.path, lease=0)
+        queue.add(self.inputs[:2], self.output)
+        self.assertEqual(queue.claim('killed'), (os.path.abspath(self.inputs[0]), os.path.join(
+            self.output, os.path.basename(self.inputs[0])[:-3] + '.cpp'), {}))
+        queue.finish(os.path.abspath(self.inputs[1]), 'killed', 0.0)
+        self.assertEqual(work(self.path, lease=0), 2)
+        queue.finish(os.path.abspath(self.inputs[0]), 'killed', 0.0, 'late result')
+        report = queue.report()
+        self.assertEqual((report['done'], report['failed']), (2, 0))
+        self.assertEqual(work(self.path), 0)
+        queue.close()
+
+    def test_outputs(self):
+        for directory in ('a', 'b', 'c', 'd'):
+            os.makedirs(os.path.join(self.directory.name, directory))
+            with open(os.path.join(self.directory.name, directory, 'x.py'), 'w') as f:
+                f.write(f'print({len(directory)})\n')
+        inputs = [os.path.join(self.directory.name, directory, 'x.py') for directory in ('a', 'b')]
+        queue = JobQueue(self.path)
+        self.assertEqual(queue.add(inputs, self.output), 2)
+        self.assertEqual(work(self.path), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'a', 'x.cpp')))
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'b', 'x.cpp')))
+        self.assertEqual(queue.add([os.path.join(self.directory.name, 'c', 'x.py')], self.output), 1)
+        with self.assertRaises(ValueError):
+            queue.add([os.path.join(self.directory.name, 'd', 'x.py')], self.output)
+        self.assertEqual(queue.report()['pending'], 1)
+        queue.close()
+
+    def test_working_directory(self):
+        queue = JobQueue(self.path)
+        queue.add(self.inputs[:2], os.path.relpath(self.output))
+        self.assertEqual(queue.add([os.path.abspath(path) for path in self.inputs[:2]], self.output), 0)
+        directory = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.assertEqual(work(self.path), 2)
+        finally:
+            os.chdir(directory)
+        self.assertEqual(queue.report()['done'], 2)
+        self.assertEqual(sorted(os.listdir(self.output)), sorted(
+            [os.path.basename(path)[:-3] + '.cpp' for path in self.inputs[:2]]))
+        queue.close()
+
+    def test_options(self):
+        queue = JobQueue(self.path)
+        queue.add(['tests/testfiles/fold.py'], self.output, {'fold': True})
+        queue.add(['tests/testfiles/memoize.py'], self.output)
+        self.assertEqual(work(self.path), 2)
+        for name, options in [('fold', {'fold': True}), ('memoize', {})]:
+            with open('tests/testfiles/' + name + '.py') as f:
+                lexer = Lexer()
+                lexer.input(f.read())
+            with open(os.path.join(self.output, name + '.cpp')) as f:
+                self.assertEqual(f.read(), CodeGen(**options).generate(*Parser().parse(lexer.tokens())))
+        queue.close()
+
+    def test_throughput(self):
+        queue = JobQueue(self.path)
+        queue.add(self.inputs[:3], self.output)
+        for number, (start, end) in enumerate([(100.0, 102.0), (101.0, 103.0), (1000.0, 1001.0)]):
+            queue.connection.execute("UPDATE jobs SET status = 'done', finished = ?, seconds = ? WHERE input = ?",
+                                     (end, end - start, os.path.abspath(self.inputs[number])))
+        report = queue.report()
+        self.assertEqual(report['seconds'], 5.0)
+        self.assertEqual(report['throughput'], 3 / 4.0)
+        queue.close()
+
+    def test_shared(self):
+        queue = JobQueue(self.path, shared=True)
+        self.assertEqual(queue.connection.execute('PRAGMA journal_mode').fetchone(), ('delete',))
+        queue.add(self.inputs[:3], self.output)
+        with multiprocessing.Pool(2) as pool:
+            processed = pool.starmap(work, [(self.path, 600, True)] * 2)
+        self.assertEqual(sum(processed), 3)
+        self.assertFalse(os.path.exists(self.path + '-wal'))
+        queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
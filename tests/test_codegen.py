@@ -1,3 +1,8 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
 import unittest
 
 from transpiler.lexer import *
@@ -103,6 +108,227 @@ class CodeGenTesting(unittest.TestCase):
             self.assertEqual(f.read(), self.codegen.generate(
                 *self.parser.parse(self.lexer.tokens())))
 
+    def test_memoize(self):
+        self.codegen = CodeGen(memoize=True)
+        with open('tests/testfiles/memoize.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/memoize.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['memoized'], ['fib'])
+
+    def test_licm(self):
+        self.codegen = CodeGen(licm=True)
+        with open('tests/testfiles/licm.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/licm.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['hoisted'], [
+                         'licm_0', 'licm_1', 'licm_2'])
+
+    def test_openmp(self):
+        self.codegen = CodeGen(openmp=True)
+        with open('tests/testfiles/openmp.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/openmp.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['for loops'], ['9', '18', '22'])
+        self.assertEqual(self.codegen.stats['parallel loops'], ['9'])
+
+    def run_program(self, code, flags):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'program.cpp')
+            with open(source, 'w') as f:
+                f.write(code)
+            subprocess.run(['g++', '-O2', '-o', os.path.join(directory, 'program'), source] + flags,
+                           check=True)
+            return subprocess.run([os.path.join(directory, 'program')], check=True,
+                                  capture_output=True, text=True, env=dict(os.environ, OMP_NUM_THREADS='4'))
+
+    @unittest.skipUnless(shutil.which('g++'), 'g++ is required')
+    def test_openmp_build(self):
+        source = 's : int = 0\ni : int = 0\nwhile i < 1000:\n\ts = s + i\n\ti = i + 1\nprint(s, i)\n'
+        self.lexer.input(source)
+        code = CodeGen(openmp=True).generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertIn('lastprivate(i)', code)
+        self.assertEqual(self.run_program(code, ['-fopenmp']).stdout,
+                         self.run_program(code, []).stdout)
+        source = 'e : int = 7\nd : int = 0 - 5\ni2 : int = 0\nwhile i2 < 0:\n\td = 2 - e\n\ti2 = i2 + 1\nprint(d, i2)\n'
+        self.lexer.input(source)
+        code = CodeGen(openmp=True).generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertIn('lastprivate(i2,d)', code)
+        self.assertEqual(self.run_program(code, ['-fopenmp']).stdout, '-50\n')
+
+    def test_cse(self):
+        self.codegen = CodeGen(cse=True)
+        with open('tests/testfiles/cse.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/cse.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['cse'], [
+                         'cse_0', 'cse_1', 'cse_2', 'cse_3'])
+
+    def test_inline(self):
+        self.codegen = CodeGen(inline=True)
+        with open('tests/testfiles/inline.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/inline.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['inline'], [
+                         'square', 'less', 'sum'])
+        self.assertEqual(self.codegen.stats['substituted'], [
+                         'square at line 18', 'less at line 19', 'square at line 20'])
+
+    def test_infer_types(self):
+        self.codegen = CodeGen(infer_types=True)
+        with open('tests/testfiles/infer_types.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/infer_types.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['overflow'], ['6'])
+
+    def test_fold(self):
+        self.codegen = CodeGen(fold=True)
+        with open('tests/testfiles/fold.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/fold.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+        self.assertEqual(self.codegen.stats['pruned'], [
+                         'if at line 12', 'elif at line 20', 'if at line 16', 'while at line 24'])
+        self.assertEqual(self.codegen.stats['unused'], ['scale', 'unused', 'debug', 'z'])
+
+    def test_fold_elif(self):
+        with open('tests/testfiles/fold_elif.py') as f:
+            source = f.read()
+        self.lexer.input(source)
+        code = self.codegen.generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertIn('    }\n    else if(x == 2)\n', code)
+        self.lexer.input(source)
+        folded = CodeGen(fold=True).generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertNotIn('x = 3;', folded)
+        if shutil.which('g++'):
+            self.assertEqual(self.run_program(code, []).stdout, '2\n')
+            self.assertEqual(self.run_program(folded, []).stdout, '2\n')
+
+    def test_profile(self):
+        self.codegen = CodeGen(profile=True)
+        with open('tests/testfiles/profile.py') as f:
+            self.lexer.input(f.read())
+        with open('tests/testfiles/profile.cpp') as f:
+            self.assertEqual(f.read(), self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())))
+
+    @unittest.skipUnless(shutil.which('g++'), 'g++ is required')
+    def test_profile_run(self):
+        with open('tests/testfiles/profile.cpp') as f:
+            result = self.run_program(f.read(), ['-std=c++17'])
+        self.assertEqual(result.stdout, '285120\n')
+        lines = result.stderr.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('profile: function factorial (line 1): 5 calls, '))
+        self.assertTrue(lines[1].startswith('profile: function square (line 8): 10 calls, '))
+        self.assertEqual(lines[2], 'profile: loop (line 13): 10 iterations')
+
+    def test_profile_memoize(self):
+        self.codegen = CodeGen(memoize=True, profile=True)
+        with open('tests/testfiles/memoize.py') as f:
+            self.lexer.input(f.read())
+        code = self.codegen.generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertIn('int fib(int n)\n{\n    profile_scope profile_guard(profile_functions[0]);\n'
+                      '    static std::unordered_map', code)
+        self.assertEqual(code.count('profile_functions[0]);'), 1)
+        if shutil.which('g++'):
+            lines = self.run_program(code, ['-std=c++17']).stderr.splitlines()
+            self.assertTrue(lines[0].startswith('profile: function fib (line 1): 116 calls, '))
+            self.assertTrue(lines[1].startswith('profile: function show (line 10): 40 calls, '))
+
+    def test_profile_json(self):
+        self.codegen = CodeGen(profile_json='out/"profile".json')
+        with open('tests/testfiles/profile.py') as f:
+            self.lexer.input(f.read())
+        code = self.codegen.generate(*self.parser.parse(self.lexer.tokens()))
+        self.assertIn('std::fopen("out/\\"profile\\".json", "w")', code)
+        self.assertIn('profile_loops[0].iterations++;', code)
+
+    @unittest.skipUnless(shutil.which('g++'), 'g++ is required')
+    def test_profile_json_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            self.codegen = CodeGen(profile_json=path)
+            with open('tests/testfiles/profile.py') as f:
+                self.lexer.input(f.read())
+            result = self.run_program(self.codegen.generate(
+                *self.parser.parse(self.lexer.tokens())), ['-std=c++17'])
+            self.assertEqual((result.stdout, result.stderr), ('285120\n', ''))
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual([(function['name'], function['line'], function['calls'])
+                          for function in report['functions']], [('factorial', 1, 5), ('square', 8, 10)])
+        self.assertEqual(report['loops'], [{'line': 13, 'iterations': 10}])
+
+    def test_units(self):
+        with open('tests/testfiles/memoize.py') as f:
+            self.lexer.input(f.read())
+        files = self.codegen.generate_units(
+            *self.parser.parse(self.lexer.tokens()), 'memoize', 3)
+        self.assertEqual(list(files), [
+                         'memoize.h', 'memoize_0.cpp', 'memoize_1.cpp', 'main.cpp', 'Makefile', 'memoize.units'])
+        self.assertIn('int fib(int n);\nvoid show(int n);\n', files['memoize.h'])
+        self.assertIn('int fib(int n)\n{', files['memoize_0.cpp'])
+        self.assertIn('void show(int n)\n{', files['memoize_1.cpp'])
+        self.assertEqual(files['memoize.units'], 'units 3\nfib 0\nshow 1\n')
+        self.assertIn('OBJECTS = memoize_0.o memoize_1.o main.o\n', files['Makefile'])
+        self.assertTrue(files['Makefile'].startswith('CXXFLAGS ?= -std=c++17 -O2\n'))
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(self.codegen.write_units(
+                files, directory), list(files))
+            files['main.cpp'] += '\n'
+            self.assertEqual(self.codegen.write_units(
+                files, directory), ['main.cpp'])
+            self.assertEqual(self.codegen.read_placement(directory, 'memoize'), (3, {'fib': 0, 'show': 1}))
+            open(os.path.join(directory, 'memoize_1.o'), 'w').close()
+            with open('tests/testfiles/memoize.py') as f:
+                self.lexer.input(f.read())
+            files = self.codegen.generate_units(*self.parser.parse(self.lexer.tokens()), 'memoize', 1,
+                                                self.codegen.read_placement(directory, 'memoize'))
+            self.codegen.write_units(files, directory)
+            self.assertEqual(self.codegen.stats['removed'], ['memoize_1.cpp', 'memoize_1.o'])
+            self.assertEqual(sorted(os.listdir(directory)), [
+                             'Makefile', 'main.cpp', 'memoize.h', 'memoize.units', 'memoize_0.cpp'])
+        self.assertTrue(files['memoize.h'].startswith('#ifndef MEMOIZE_H\n#define MEMOIZE_H\n'))
+        for name, guard in [('my-file', 'MY_FILE_H'), ('1', 'UNIT_1_H'), ('é.x', 'UNIT___X_H')]:
+            self.lexer.input('print(1)\n')
+            files = CodeGen().generate_units(*self.parser.parse(self.lexer.tokens()), name, 1)
+            self.assertTrue(files[name + '.h'].startswith(f'#ifndef {guard}\n#define {guard}\n'))
+
+    def test_units_stable(self):
+        source = ''.join([f'def f{number}(n : int) -> int:\n\treturn n + {number}\n\n'
+                          for number in range(8)]) + 'print(f0(1), f7(2))\n'
+        with tempfile.TemporaryDirectory() as directory:
+            self.lexer.input(source)
+            files = self.codegen.generate_units(
+                *self.parser.parse(self.lexer.tokens()), 'p', 3)
+            self.codegen.write_units(files, directory)
+            self.assertEqual([name for name in files if name.endswith('.cpp')], [
+                             'p_0.cpp', 'p_1.cpp', 'p_2.cpp', 'main.cpp'])
+            self.lexer.input(source.replace('return n + 7', 'n = n * n * n + 7\n\treturn n - 1'))
+            files = self.codegen.generate_units(
+                *self.parser.parse(self.lexer.tokens()), 'p', 3, self.codegen.read_placement(directory, 'p'))
+            written = self.codegen.write_units(files, directory)
+            self.assertEqual(len(written), 1)
+            self.assertIn('int f7(int n)\n{', files[written[0]])
+            self.lexer.input(source.replace('def f7', 'def f8').replace('f7(2)', 'f8(2)'))
+            files = self.codegen.generate_units(
+                *self.parser.parse(self.lexer.tokens()), 'p', 3, self.codegen.read_placement(directory, 'p'))
+        self.assertNotIn('f7 ', files['p.units'])
+        self.assertIn('f8 ', files['p.units'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,4 @@
+import os
 import unittest
 
 from transpiler.lexer import *
@@ -53,6 +54,75 @@ class LexerTesting(unittest.TestCase):
         with self.assertRaises(LexerError):
             self.lexer.token()
 
+    def test_recover(self):
+        lexer = Lexer(recover=True)
+        lexer.input('x &$ 1\ny ? = 2')
+        self.assertEqual(list(lexer.tokens()), [Token(1, 'IDENTIFIER', 'x'), Token(1, 'VALUE_INT', 1), Token(
+            2, 'NEWLINE'), Token(2, 'IDENTIFIER', 'y'), Token(2, 'EQUALS'), Token(2, 'VALUE_INT', 2)])
+        self.assertEqual([error.line for error in lexer.errors], [1, 2])
+        lexer.input('& ' * 5000 + 'x')
+        self.assertEqual(list(lexer.tokens()), [Token(1, 'IDENTIFIER', 'x')])
+        self.assertEqual(len(lexer.errors), 5000)
+
+    def test_line_index(self):
+        self.lexer.input('x = 1\n\tif\n\t\n\t\tprint')
+        index = self.lexer.line_index()
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.start(3), 10)
+        self.assertEqual(index.indent(4), 2)
+        self.assertTrue(index.blank(3))
+        self.assertFalse(index.blank(2))
+        self.assertEqual(index.line(10), 3)
+
+    def test_line_index_chunks(self):
+        buffer = 'é€ = 1\n\t\t😀\n\n\tx\t\n' * 50
+        class SmallIndex(LineIndex):
+            chunk = 7
+            block = 5
+        index = SmallIndex(buffer)
+        starts = [0] + [pos + 1 for pos, char in enumerate(buffer) if char == '\n']
+        self.assertEqual(list(index.starts), starts)
+        self.assertEqual(list(index.indents[:5]), [0, 2, 0, 1, 0])
+        self.assertEqual(list(index.blanks[:5]), [False, False, True, False, False])
+        self.assertEqual([index.line(pos) for pos in range(len(buffer))],
+                         [buffer.count('\n', 0, pos + 1) + 1 for pos in range(len(buffer))])
+        self.assertEqual([index.resume(line) for line in range(1, len(index) + 1)],
+                         [LineIndex(buffer).resume(line) for line in range(1, len(index) + 1)])
+
+    def test_seek(self):
+        buffers = []
+        for name in sorted(os.listdir('tests/testfiles')):
+            if name.endswith('.py'):
+                with open(os.path.join('tests/testfiles', name)) as f:
+                    buffers.append(f.read())
+        buffers += ['\t\nx = 1 \n\n\tif\t\n  \n\t\t\n\t  y\r\nz\n\t\n', '\n\t\n\t\tx\n \t', '']
+        lexer = Lexer(recover=True)
+        for data in buffers:
+            lexer.input(data)
+            steps = []
+            token = lexer.token()
+            while token is not None:
+                steps.append((lexer.pos, token))
+                token = lexer.token()
+            tokens = [token for _, token in steps]
+            for line in range(1, len(lexer.line_index()) + 1):
+                start = lexer.line_index().start(line)
+                first = next((i for i, (pos, _) in enumerate(steps) if pos >= start), len(steps))
+                if line > 1 and first < len(steps) and tokens[first].type in ('NEWLINE', 'INDENT', 'DEDENT') \
+                        and steps[first][0] == start + lexer.line_index().indent(line):
+                    first += 1
+                lexer.seek(line)
+                self.assertEqual(list(lexer.tokens()), tokens[first:], (data, line))
+
+    def test_scan(self):
+        with open('tests/testfiles/complex3.py') as f:
+            self.lexer.input(f.read())
+        self.assertEqual(list(self.lexer.scan()), [
+                         (token.type, token.value, token.line) for token in self.lexer.tokens()])
+        self.lexer.input('x\n &')
+        with self.assertRaises(LexerError):
+            list(self.lexer.scan())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+
+from transpiler.lexer import *
+from transpiler.parser import *
+from transpiler.optimizer import *
+
+
+class OptimizerTesting(unittest.TestCase):
+
+    def setUp(self):
+        self.lexer = Lexer()
+        self.parser = Parser()
+        self.optimizer = Optimizer()
+
+    def parse(self, path):
+        with open(path) as f:
+            self.lexer.input(f.read())
+        return self.parser.parse(self.lexer.tokens())
+
+    def test_pure_functions(self):
+        variables, ast = self.parse('tests/testfiles/memoize.py')
+        self.assertEqual(self.optimizer.pure_functions(variables, ast), {'fib'})
+
+    def test_global_read(self):
+        self.lexer.input('y : int = 2\ndef f(n : int) -> int:\n\treturn n + y\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.pure_functions(variables, ast), set())
+
+    def test_memoizable_functions(self):
+        variables, ast = self.parse('tests/testfiles/complex3.py')
+        self.assertEqual(self.optimizer.memoizable_functions(
+            variables, ast), ['factorial'])
+
+    def test_expression_tree(self):
+        elements = [Token(1, 'IDENTIFIER', 'a'), Token(1, 'PLUS'), Token(1, 'IDENTIFIER', 'b'), Token(
+            1, 'MULTIPLY'), Token(1, 'IDENTIFIER', 'c'), Token(1, 'ISLESS'), Token(1, 'VALUE_INT', 2)]
+        tree = self.optimizer.expression_tree(elements)
+        self.assertEqual(tree[:2], (0, 7))
+        self.assertEqual(tree[2][:2], (0, 5))
+        self.assertEqual(tree[2][3][:2], (2, 5))
+
+    def test_hoist_invariants(self):
+        self.lexer.input('i = 0\nwhile i < n:\n\tx : int = a * b + i\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.hoist_invariants(variables, ast), [])
+        self.lexer.input('a : int = 2\nb : int = 3\ni = 0\nwhile i < 9:\n\tx : int = a * b + i\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.hoist_invariants(variables, ast), ['licm_0'])
+        self.assertIn(('licm_0', 'INT'), variables[''])
+        self.assertEqual([str(node.name) for node in ast.children[3].children], [
+                         'IDENTIFIER(licm_0)', 'COLON'])
+
+    def test_hoist_condition(self):
+        self.lexer.input('def small(x : int) -> bool:\n\treturn x < 3\n\na : int = 10\nb : int = 2\ni : int = 0\n'
+                         'while i < a / b:\n\ts : int = a % b\n\ti = i + 1\nwhile small(a):\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.hoist_invariants(variables, ast), ['licm_0', 'licm_1', 'licm_2'])
+        self.assertEqual([str(node.name) for node in ast.children], [
+                         'DEF', 'EQUALS', 'EQUALS', 'EQUALS', 'EQUALS', 'IF', 'WHILE', 'EQUALS', 'WHILE'])
+        self.assertEqual([str(node.name) for node in PreOrderIter(ast.children[5].children[0])], [
+                         'COLON', 'IDENTIFIER(i)', 'ISLESS', 'IDENTIFIER(a)', 'DIVIDE', 'IDENTIFIER(b)'])
+
+    def test_counted_loops(self):
+        self.lexer.input('i : int = 0\nwhile i < 9:\n\ti = i * 2\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.counted_loops(variables, ast), ([], []))
+        self.lexer.input('s : int = 0\ni : int = 0\nwhile i < 9:\n\ts = s + i\n\tprint(s)\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.counted_loops(
+            variables, ast, openmp=True), (['3'], []))
+        self.assertEqual([str(node.name) for node in ast.children], [
+                         'EQUALS', 'FOR'])
+
+    def test_parallel_clauses(self):
+        self.lexer.input('s : int = 0\nt : int = 0\ni : int = 0\nwhile i < 9:\n\ts = s + t\n\tt = i\n\ti = i + 1\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.counted_loops(
+            variables, ast, openmp=True), (['4'], []))
+
+    def test_cons(self):
+        elements = [Token(1, 'IDENTIFIER', 'z'), Token(1, 'MULTIPLY'), Token(1, 'IDENTIFIER', 'z'), Token(
+            1, 'PLUS'), Token(2, 'IDENTIFIER', 'z'), Token(2, 'MULTIPLY'), Token(2, 'IDENTIFIER', 'z')]
+        table = {}
+        tree = self.optimizer.expression_tree(elements)
+        self.assertEqual(self.optimizer.cons(table, elements, tree[2]),
+                         self.optimizer.cons(table, elements, tree[3]))
+        self.assertNotEqual(self.optimizer.cons(table, elements, tree),
+                            self.optimizer.cons(table, elements, tree[2]))
+
+    def test_common_subexpressions(self):
+        self.lexer.input('a : int = 1\nx : int = a * 2\na = 2\ny : int = a * 2\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.eliminate_common_subexpressions(variables, ast), [])
+        self.lexer.input('a : int = 1\nif a > 0 and 4 / a > 1:\n\tprint(4 / a)\n\tprint(4 / a)\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        self.assertEqual(self.optimizer.eliminate_common_subexpressions(variables, ast), ['cse_0'])
+        self.assertEqual([str(node.name) for node in ast.children[1].children[1].children], [
+                         'EQUALS', 'PRINT', 'PRINT'])
+
+    def test_recursive_functions(self):
+        variables, ast = self.parse('tests/testfiles/inline.py')
+        self.assertEqual(self.optimizer.recursive_functions(ast), {'factorial'})
+        self.assertEqual(self.optimizer.call_graph(ast)['factorial'], {'factorial'})
+
+    def test_substitute_budget(self):
+        variables, ast = self.parse('tests/testfiles/inline.py')
+        self.assertEqual(self.optimizer.substitute_calls(variables, ast, 0), [
+                         'less at line 19'])
+
+    def test_infer_types(self):
+        self.lexer.input('i : int = 10\nwhile i > 0:\n\tx = i * 1000000\n\ti = i - 2\nd = i / 3\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        types, overflows = self.optimizer.infer_types(variables, ast)
+        self.assertEqual(types[('', 'i')], 'int32_t')
+        self.assertEqual(types[('', 'x')], 'int32_t')
+        self.assertEqual(types[('', 'd')], 'int32_t')
+        self.assertEqual(variables[''], [('i', 'INT'), ('x', 'INT'), ('d', 'INT')])
+        self.assertEqual(overflows, [])
+        self.assertEqual(self.optimizer.interval('MULTIPLY', (-1, 3), (-5, 2)), (-15, 6))
+        self.assertEqual(self.optimizer.interval('MODULO', (-7, 7), (0, 3)), (-2, 2))
+
+    def test_infer_joined_types(self):
+        self.lexer.input('x = 1\nx = x + 0.5\ny = 1 < 2\ny = 7\nprint(x, y)\n')
+        variables, ast = self.parser.parse(self.lexer.tokens())
+        types, overflows = self.optimizer.infer_types(variables, ast)
+        self.assertEqual(types[('', 'x')], 'double')
+        self.assertEqual(types[('', 'y')], 'int32_t')
+        self.assertEqual(variables[''], [('x', 'FLOAT'), ('y', 'INT')])
+
+    def test_constant(self):
+        for source, value in [('-7 / 2', ('INT', -3)), ('-7 % 2', ('INT', -1)), ('7 % -2', ('INT', 1)),
+                              ('1 + 2.5', ('FLOAT', 3.5)), ('not 0 or 2 < 1', ('BOOL', True)),
+                              ('1 / 0', None), ('1.0 % 2', None), ('65536 * 65536', None)]:
+            self.lexer.input('x = ' + source)
+            elements = [token for token in self.lexer.tokens()][2:]
+            self.assertEqual(self.optimizer.constant(
+                elements, self.optimizer.expression_tree(elements)), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
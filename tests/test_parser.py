@@ -76,8 +76,38 @@ class ParserTesting(unittest.TestCase):
     def test_statement_error(self):
         tokens = iter([Token(1, 'IDENTIFIER', 'x'), Token(1, 'LP'), Token(1, 'IDENTIFIER', 'y'), Token(
             1, 'PLUS'), Token(1, 'RP'), Token(1, 'NEWLINE')])
-        with self.assertRaises(ParserError):
+        with self.assertRaises(ParserError) as error:
             variables, ast = self.parser.parse(tokens)
+        self.assertTrue(str(error.exception).startswith('line 1: unexpected token '))
+        self.assertEqual(str(ParserError(Token(3, 'RP'), ['NEWLINE', 'COLON'])),
+                         'line 3: unexpected token RP, expected COLON, NEWLINE')
+
+    def test_recover(self):
+        lexer = Lexer()
+        lexer.input('x : int = x++\nwhile x < :\n\tx = x + 1\nelse:\n\tprint(x)\n'
+                    'def f(a int) -> int:\n\treturn a\ny : int = 1\n')
+        parser = Parser(recover=True)
+        variables, ast = parser.parse(lexer.tokens())
+        self.assertEqual([(error.line, str(error.token), error.expected) for error in parser.errors], [
+            (1, 'PLUS', ('IDENTIFIER', 'VALUE_BOOL', 'VALUE_FLOAT', 'VALUE_INT')),
+            (2, 'COLON', ('IDENTIFIER', 'VALUE_BOOL', 'VALUE_FLOAT', 'VALUE_INT')),
+            (6, 'INT', ('COLON',))])
+        self.assertEqual(variables[''], [('x', 'INT'), ('y', 'INT')])
+        self.assertEqual(str(ast.children[-1].children[0].name), 'IDENTIFIER(y)')
+
+    def test_recognizer(self):
+        recognizer = Recognizer()
+        with open('tests/testfiles/complex3.py') as f:
+            recognizer.check(f.read())
+        with open('tests/testfiles/syntax_error.py') as f:
+            with self.assertRaises(ParserError) as error:
+                recognizer.check(f.read())
+        self.assertEqual(error.exception.token, Token(1, 'PLUS'))
+        with self.assertRaises(ParserError):
+            recognizer.check('x : int = 1\nx : float = 2.0\n')
+        with open('tests/testfiles/undefined_token_error.py') as f:
+            with self.assertRaises(LexerError):
+                recognizer.check(f.read())
 
 
 if __name__ == '__main__':
@@ -11,7 +11,7 @@ int main()
         {
             std::cout << 0 << std::endl;
         }
-        if(x % 3 == 1)
+        else if(x % 3 == 1)
         {
             std::cout << 1 << std::endl;
         }
@@ -0,0 +1,45 @@
+#include <iostream>
+
+float cube(float n)
+{
+    return n * n * n;
+}
+
+int main()
+{
+    int a;
+    int b;
+    float z;
+    int x;
+    int y;
+    float w;
+    float v;
+    float c;
+    float d;
+    int e;
+    float cse_0;
+    int cse_1;
+    int cse_2;
+    float cse_3;
+    a = 3;
+    b = 4;
+    z = 1.5;
+    cse_1 = a * b;
+    x = cse_1 + 1;
+    y = cse_1 + 2;
+    cse_0 = z * z * z;
+    w = cse_0;
+    v = cse_0 + 1.0;
+    cse_3 = cube(z);
+    c = cse_3;
+    d = cse_3;
+    a = a + 1;
+    cse_2 = a * b;
+    e = cse_2;
+    if(cse_2 > 3 && b / a > 1)
+    {
+        std::cout << x << y << w << v << c << d << e << std::endl;
+    }
+    std::cout << a * b << std::endl;
+    return 0;
+}
@@ -0,0 +1,17 @@
+def cube(n : float) -> float:
+	return n * n * n
+
+a : int = 3
+b : int = 4
+z : float = 1.5
+x : int = a * b + 1
+y : int = a * b + 2
+w : float = z * z * z
+v : float = z * z * z + 1.0
+c : float = cube(z)
+d : float = cube(z)
+a = a + 1
+e : int = a * b
+if a * b > 3 and b / a > 1:
+	print(x, y, w, v, c, d, e)
+print(a * b)
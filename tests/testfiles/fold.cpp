@@ -0,0 +1,37 @@
+#include <iostream>
+
+float area(float r)
+{
+    float pi;
+    pi = 3.14159;
+    return pi * r * r;
+}
+
+int main()
+{
+    int seconds;
+    int x;
+    float y;
+    seconds = 7200;
+    x = -2;
+    y = x * 1.5 + 0.5;
+    std::cout << seconds << std::endl;
+    if(x < 3)
+    {
+        std::cout << 2 << std::endl;
+    }
+    else
+    {
+        std::cout << 3 << std::endl;
+    }
+    while(x < -30)
+    {
+        if(1 && x != 0)
+        {
+            std::cout << x << std::endl;
+        }
+        x = x + 1;
+    }
+    std::cout << x << y << std::endl;
+    return 0;
+}
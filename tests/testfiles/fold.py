@@ -0,0 +1,30 @@
+def area(r : float) -> float:
+	pi : float = 3.0 + 0.14159
+	scale : float = 1.0
+	unused : int = 2 * 3
+	return pi * r * r
+
+seconds : int = 2 * 60 * 60
+debug : bool = 1 > 2
+x : int = 7 / -2 + 7 % -2
+y : float = x * 1.5 + 2.0 / 4
+z : float = area(y)
+if True:
+	print(seconds)
+else:
+	print(0)
+if 1 > 2:
+	print(1)
+elif x < 1 + 2:
+	print(2)
+elif not False:
+	print(3)
+else:
+	print(4)
+while False:
+	x = x + 1
+while x < 0 - 10 * 3:
+	if 2 * 3 == 6 and x != 0:
+		print(x)
+	x = x + 1
+print(x, y)
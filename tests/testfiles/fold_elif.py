@@ -0,0 +1,6 @@
+x : int = 1
+if 1 == 1:
+	x = 2
+elif x == 2:
+	x = 3
+print(x)
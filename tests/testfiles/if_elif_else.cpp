@@ -7,7 +7,7 @@ int main()
     {
         std::cout << 1 << std::endl;
     }
-    if(2 == 2)
+    else if(2 == 2)
     {
         std::cout << 2 << std::endl;
     }
@@ -0,0 +1,39 @@
+#include <cstdint>
+#include <iostream>
+
+int64_t factorial(int64_t n)
+{
+    int64_t m;
+    int64_t f;
+    if(n < 2)
+    {
+        return 1;
+    }
+    m = n - 1;
+    f = factorial(m);
+    return n * f;
+}
+
+int main()
+{
+    int32_t i;
+    double scale;
+    int64_t f;
+    int64_t total;
+    int64_t square;
+    int64_t big;
+    i = 0;
+    total = 0;
+    scale = 0.5;
+    while(i < 100000)
+    {
+        square = (int64_t) i * i;
+        total = total + square;
+        scale = scale * 1.0001;
+        i = i + 1;
+    }
+    big = (int64_t) 3000000 * 3000;
+    f = factorial(20);
+    std::cout << total << scale << big << f << std::endl;
+    return 0;
+}
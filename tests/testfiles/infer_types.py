@@ -0,0 +1,19 @@
+def factorial(n : int) -> int:
+	if n < 2:
+		return 1
+	m : int = n - 1
+	f : int = factorial(m)
+	return n * f
+
+i : int = 0
+total = 0
+scale : float = 0.5
+while i < 100000:
+	square = i * i
+	total = total + square
+	scale = scale * 1.0001
+	i = i + 1
+
+big = 3000000 * 3000
+f : int = factorial(20)
+print(total, scale, big, f)
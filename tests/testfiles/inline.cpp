@@ -0,0 +1,42 @@
+#include <iostream>
+
+static inline int square(int n)
+{
+    return n * n;
+}
+static inline bool less(int a, int b)
+{
+    return a < b;
+}
+static inline float sum(float a, float b)
+{
+    return a + b;
+}
+int factorial(int n)
+{
+    int m;
+    int f;
+    if(! n)
+    {
+        return 1;
+    }
+    m = n - 1;
+    f = factorial(m);
+    return n * f;
+}
+
+int main()
+{
+    int x;
+    int y;
+    bool z;
+    float w;
+    int v;
+    x = 3;
+    y = x * x;
+    z = x < y;
+    std::cout << y * y << less(x, 4) << std::endl;
+    w = sum(x, 2.5);
+    v = factorial(x);
+    return 0;
+}
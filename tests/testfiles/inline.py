@@ -0,0 +1,22 @@
+def square(n : int) -> int:
+	return n * n
+
+def less(a : int, b : int) -> bool:
+	return a < b
+
+def sum(a : float, b : float) -> float:
+	return a + b
+
+def factorial(n : int) -> int:
+	if not n:
+		return 1
+	m : int = n - 1
+	f : int = factorial(m)
+	return n * f
+
+x : int = 3
+y : int = square(x)
+z : bool = less(x, y)
+print(square(y), less(x, 4))
+w : float = sum(x, 2.5)
+v : int = factorial(x)
@@ -0,0 +1,51 @@
+#include <iostream>
+
+int cost(int n)
+{
+    int s;
+    int j;
+    s = 0;
+    j = 0;
+    while(j < n)
+    {
+        s = s + j % 7;
+        j = j + 1;
+    }
+    return s;
+}
+
+int main()
+{
+    int k;
+    int a;
+    int b;
+    int i;
+    int total;
+    int c;
+    int licm_0;
+    int licm_1;
+    int licm_2;
+    k = 3000;
+    a = 3;
+    b = 4;
+    i = 0;
+    total = 0;
+    if(i < 100000)
+    {
+        licm_0 = cost(k);
+        licm_1 = a * b;
+        licm_2 = a * b * 1000;
+    }
+    while(i < 100000)
+    {
+        c = licm_0;
+        total = total + c % 1000 + licm_1 - i % 3;
+        if(total > licm_2)
+        {
+            total = total / b;
+        }
+        i = i + 1;
+    }
+    std::cout << total << std::endl;
+    return 0;
+}
@@ -0,0 +1,20 @@
+def cost(n : int) -> int:
+	s : int = 0
+	j : int = 0
+	while j < n:
+		s = s + j % 7
+		j = j + 1
+	return s
+
+k : int = 3000
+a : int = 3
+b : int = 4
+i : int = 0
+total : int = 0
+while i < 100000:
+	c : int = cost(k)
+	total = total + c % 1000 + a * b - i % 3
+	if total > a * b * 1000:
+		total = total / b
+	i = i + 1
+print(total)
@@ -0,0 +1,57 @@
+#include <cstdint>
+#include <unordered_map>
+#include <iostream>
+
+int fib(int n);
+
+int fib_memo_body(int n)
+{
+    int a;
+    int b;
+    int x;
+    int y;
+    if(n < 2)
+    {
+        return n;
+    }
+    a = n - 1;
+    b = n - 2;
+    x = fib(a);
+    y = fib(b);
+    return x + y;
+}
+
+int fib(int n)
+{
+    static std::unordered_map<std::uint64_t, int> memo_table;
+    std::uint64_t memo_key = (std::uint64_t)(std::uint32_t)n;
+    auto memo_found = memo_table.find(memo_key);
+    if(memo_found != memo_table.end())
+    {
+        return memo_found->second;
+    }
+    int memo_result = fib_memo_body(n);
+    if(memo_table.size() < 65536)
+    {
+        memo_table.emplace(memo_key, memo_result);
+    }
+    return memo_result;
+}
+void show(int n)
+{
+    std::cout << n << std::endl;
+}
+
+int main()
+{
+    int i;
+    int f;
+    i = 0;
+    while(i < 40)
+    {
+        f = fib(i);
+        show(f);
+        i = i + 1;
+    }
+    return 0;
+}
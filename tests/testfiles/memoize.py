@@ -0,0 +1,17 @@
+def fib(n : int) -> int:
+	if n < 2:
+		return n
+	a : int = n - 1
+	b : int = n - 2
+	x : int = fib(a)
+	y : int = fib(b)
+	return x + y
+
+def show(n : int) -> None:
+	print(n)
+
+i : int = 0
+while i < 40:
+	f : int = fib(i)
+	show(f)
+	i = i + 1
@@ -0,0 +1,48 @@
+#include <iostream>
+
+int square(int n)
+{
+    return n * n;
+}
+
+int main()
+{
+    int n;
+    int total;
+    float product;
+    int x;
+    int i;
+    int s;
+    int j;
+    int k;
+    n = 40000;
+    total = 0;
+    product = 1.0;
+    x = 0;
+    i = 0;
+    if(i < n)
+    {
+        #pragma omp parallel for reduction(*:product) reduction(+:total) lastprivate(i,s,x)
+        for(i = 0; i < n; i = i + 1)
+        {
+            s = square(i);
+            x = s % 7;
+            total = total + x;
+            if(x == 3)
+            {
+                product = product * 1.0001;
+            }
+        }
+    }
+    std::cout << total << product << x << std::endl;
+    for(j = 0; j < 3; j = j + 1)
+    {
+        std::cout << j << std::endl;
+    }
+    for(k = 10; k > 0; k = k - 2)
+    {
+        total = total - k;
+    }
+    std::cout << total << std::endl;
+    return 0;
+}
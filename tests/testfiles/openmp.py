@@ -0,0 +1,25 @@
+def square(n : int) -> int:
+	return n * n
+
+n : int = 40000
+total : int = 0
+product : float = 1.0
+x : int = 0
+i : int = 0
+while i < n:
+	s : int = square(i)
+	x = s % 7
+	total = total + x
+	if x == 3:
+		product = product * 1.0001
+	i = i + 1
+print(total, product, x)
+j : int = 0
+while j < 3:
+	print(j)
+	j = j + 1
+k : int = 10
+while k > 0:
+	total = total - k
+	k = k - 2
+print(total)
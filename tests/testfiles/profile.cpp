@@ -0,0 +1,95 @@
+#include <chrono>
+#include <cstdio>
+#include <iostream>
+
+struct profile_function
+{
+    const char *name;
+    int line;
+    unsigned long long calls;
+    int depth;
+    std::chrono::steady_clock::duration time;
+};
+
+struct profile_loop
+{
+    int line;
+    unsigned long long iterations;
+};
+
+inline profile_function profile_functions[] = {{"factorial", 1, 0, 0, {}}, {"square", 8, 0, 0, {}}, {nullptr, 0, 0, 0, {}}};
+inline profile_loop profile_loops[] = {{13, 0}, {0, 0}};
+
+struct profile_scope
+{
+    profile_function &function;
+    std::chrono::steady_clock::time_point start;
+    profile_scope(profile_function &function) : function(function), start(std::chrono::steady_clock::now())
+    {
+        function.calls++;
+        function.depth++;
+    }
+    ~profile_scope()
+    {
+        if(--function.depth == 0)
+        {
+            function.time += std::chrono::steady_clock::now() - start;
+        }
+    }
+};
+
+struct profile_report
+{
+    ~profile_report()
+    {
+        for(profile_function *f = profile_functions; f->name; f++)
+        {
+            std::fprintf(stderr, "profile: function %s (line %d): %llu calls, %.6f s\n", f->name, f->line, f->calls, std::chrono::duration<double>(f->time).count());
+        }
+        for(profile_loop *l = profile_loops; l->line; l++)
+        {
+            std::fprintf(stderr, "profile: loop (line %d): %llu iterations\n", l->line, l->iterations);
+        }
+    }
+};
+
+inline profile_report profile_report_instance;
+
+int factorial(int n)
+{
+    int m;
+    int f;
+    profile_scope profile_guard(profile_functions[0]);
+    if(n < 2)
+    {
+        return 1;
+    }
+    m = n - 1;
+    f = factorial(m);
+    return n * f;
+}
+int square(int x)
+{
+    profile_scope profile_guard(profile_functions[1]);
+    return x * x;
+}
+
+int main()
+{
+    int total;
+    int i;
+    int s;
+    int f;
+    total = 0;
+    i = 0;
+    while(i < 10)
+    {
+        profile_loops[0].iterations++;
+        s = square(i);
+        total = total + s;
+        i = i + 1;
+    }
+    f = factorial(5);
+    std::cout << total << f << std::endl;
+    return 0;
+}
@@ -0,0 +1,18 @@
+def factorial(n : int) -> int:
+	if n < 2:
+		return 1
+	m : int = n - 1
+	f : int = factorial(m)
+	return n * f
+
+def square(x : int) -> int:
+	return x * x
+
+total : int = 0
+i : int = 0
+while i < 10:
+	s : int = square(i)
+	total = total + s
+	i = i + 1
+f : int = factorial(5)
+print(total, f)
@@ -0,0 +1,224 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+from transpiler.lexer import *
+from transpiler.parser import *
+from transpiler.codegen import *
+
+
+class JobQueue:
+    """ Queue of files to transpile stored in SQLite database, shared by
+        worker processes. Finished jobs are never repeated and jobs of
+        killed workers are claimed again after lease time. WAL journal
+        works only for workers on one host, database shared by hosts over
+        a network filesystem uses rollback journal.
+    """
+
+    def __init__(self, path, lease=600, shared=False):
+        self.path = path
+        self.lease = lease
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute(
+            'PRAGMA journal_mode=' + ('DELETE' if shared else 'WAL'))
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+            input TEXT PRIMARY KEY,
+            output TEXT NOT NULL,
+            options TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            claimed REAL,
+            finished REAL,
+            seconds REAL,
+            error TEXT)''')
+        if 'options' not in [row[1] for row in self.connection.execute('PRAGMA table_info(jobs)')]:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN options TEXT NOT NULL DEFAULT '{}'")
+        self.connection.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS jobs_output ON jobs (output)')
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, inputs, directory, options=None):
+        """ Add input files with outputs in directory, keeping their paths
+            relative to the common directory of the inputs. Paths are stored
+            absolute, so workers may run from any directory, and CodeGen
+            options are stored with each job, so resumed runs use the same
+            settings. Files already in the queue are left untouched. Returns
+            number of new jobs.
+            Raises ValueError if two inputs would write the same output.
+        """
+        if not inputs:
+            return 0
+        inputs = [os.path.abspath(path) for path in inputs]
+        directory = os.path.abspath(directory)
+        base = os.path.commonpath([os.path.dirname(path) for path in inputs])
+        added = 0
+        self.connection.execute('BEGIN IMMEDIATE')
+        for path in inputs:
+            output = os.path.join(directory, os.path.relpath(
+                os.path.splitext(path)[0], base) + '.cpp')
+            if self.connection.execute('SELECT 1 FROM jobs WHERE input = ?', (path,)).fetchone():
+                continue
+            row = self.connection.execute(
+                'SELECT input FROM jobs WHERE output = ?', (output,)).fetchone()
+            if row is not None:
+                self.connection.execute('ROLLBACK')
+                raise ValueError(f'{row[0]} and {path} would both write {output}')
+            self.connection.execute('INSERT INTO jobs (input, output, options) VALUES (?, ?, ?)',
+                                    (path, output, json.dumps(options or {}, sort_keys=True)))
+            added += 1
+        self.connection.execute('COMMIT')
+        return added
+
+    def claim(self, worker):
+        """ Return (input, output, options) of pending job or job with
+            expired lease assigned to worker, or None if there is nothing
+            left to do
+        """
+        now = time.time()
+        self.connection.execute('BEGIN IMMEDIATE')
+        row = self.connection.execute('''SELECT input, output, options FROM jobs
+            WHERE status = 'pending' OR (status = 'running' AND claimed < ?)
+            ORDER BY rowid LIMIT 1''', (now - self.lease,)).fetchone()
+        if row is not None:
+            self.connection.execute('''UPDATE jobs SET status = 'running', worker = ?,
+                attempts = attempts + 1, claimed = ? WHERE input = ?''', (worker, now, row[0]))
+        self.connection.execute('COMMIT')
+        return None if row is None else (row[0], row[1], json.loads(row[2]))
+
+    def finish(self, input, worker, seconds, error=None):
+        """ Record result of job unless it was claimed by another worker
+        """
+        status = 'done' if error is None else 'failed'
+        self.connection.execute('''UPDATE jobs SET status = ?, finished = ?, seconds = ?,
+            error = ? WHERE input = ? AND worker = ?''',
+                                (status, time.time(), seconds, error, input, worker))
+
+    def retry(self):
+        """ Move failed jobs back to pending. Returns number of jobs.
+        """
+        return self.connection.execute(
+            "UPDATE jobs SET status = 'pending', error = NULL WHERE status = 'failed'").rowcount
+
+    def report(self):
+        """ Return dictionary with number of jobs in each status, total
+            transpilation time, throughput in files per second and errors.
+            Throughput is measured over time when any job was running, so
+            idle time between interrupted and resumed runs is not counted.
+        """
+        report = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for status, count in self.connection.execute(
+                'SELECT status, COUNT(*) FROM jobs GROUP BY status'):
+            report[status] = count
+        jobs = self.connection.execute('''SELECT finished - seconds, finished FROM jobs
+            WHERE status IN ('done', 'failed') ORDER BY finished - seconds''').fetchall()
+        report['seconds'] = sum([end - start for start, end in jobs])
+        active = 0.0
+        last = None
+        for start, end in jobs:
+            if last is not None and start < last:
+                start = last
+            if last is None or end > last:
+                active += end - start
+                last = end
+        report['throughput'] = len(jobs) / active if active > 0 else 0.0
+        report['errors'] = self.connection.execute(
+            "SELECT input, error FROM jobs WHERE status = 'failed' ORDER BY input").fetchall()
+        return report
+
+
+def transpile(input, output, options):
+    """ Transpile input file into output file replaced atomically.
+        Returns error message or None.
+    """
+    with open(input) as f:
+        data = f.read()
+    lexer = Lexer()
+    lexer.input(data)
+    try:
+        code = CodeGen(**options).generate(*Parser().parse(lexer.tokens()))
+    except LexerError as le:
+        return f'lexical error: line {le.line}'
+    except ParserError as pe:
+        return f'syntax error: token {pe.token}, line {pe.token.line}'
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    temporary = f'{output}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        f.write(code)
+    os.replace(temporary, output)
+    return None
+
+
+def work(path, lease=600, shared=False):
+    """ Process jobs from the queue until none is left.
+        Returns number of processed jobs.
+    """
+    queue = JobQueue(path, lease, shared)
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    processed = 0
+    job = queue.claim(worker)
+    while job is not None:
+        start = time.perf_counter()
+        try:
+            error = transpile(*job)
+        except Exception as e:
+            error = repr(e)
+        queue.finish(job[0], worker, time.perf_counter() - start, error)
+        processed += 1
+        job = queue.claim(worker)
+    queue.close()
+    return processed
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('queue', help='queue database path')
+    arg_parser.add_argument('--shared', action='store_true',
+                            help='database is used by workers on several hosts over a network filesystem')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    add_parser = commands.add_parser('add', help='add files to the queue')
+    add_parser.add_argument('inputs', nargs='+', help='input file paths')
+    add_parser.add_argument('--output', required=True,
+                            help='output directory')
+    add_codegen_arguments(add_parser)
+    work_parser = commands.add_parser(
+        'work', help='transpile queued files until none is left')
+    work_parser.add_argument('--workers', type=int, default=1,
+                             help='number of local worker processes')
+    work_parser.add_argument('--lease', type=float, default=600,
+                             help='seconds after which job of a dead worker is claimed again')
+    commands.add_parser('retry', help='queue failed files again')
+    commands.add_parser('report', help='print progress and throughput')
+    args = arg_parser.parse_args()
+    if args.command == 'add':
+        queue = JobQueue(args.queue, shared=args.shared)
+        try:
+            print(f'added {queue.add(args.inputs, args.output, codegen_options(args))} files')
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+    elif args.command == 'work':
+        JobQueue(args.queue, shared=args.shared).close()
+        with multiprocessing.Pool(args.workers) as pool:
+            processed = pool.starmap(
+                work, [(args.queue, args.lease, args.shared)] * args.workers)
+        print(f'processed {sum(processed)} files')
+    elif args.command == 'retry':
+        print(f'queued {JobQueue(args.queue, shared=args.shared).retry()} files again')
+    else:
+        report = JobQueue(args.queue, shared=args.shared).report()
+        total = sum([report[status]
+                    for status in ('pending', 'running', 'done', 'failed')])
+        print(f'done: {report["done"]}/{total}, failed: {report["failed"]}, '
+              f'running: {report["running"]}, pending: {report["pending"]}')
+        print(f'transpilation time: {report["seconds"]:.3f} s, '
+              f'throughput: {report["throughput"]:.1f} files/s')
+        for input, error in report['errors']:
+            print(f'{input}: {error}')
@@ -1,25 +1,303 @@
+import argparse
+import os
+import re
 import sys
 
 from transpiler.lexer import *
 from transpiler.parser import *
+from transpiler.optimizer import *
 
 
 class CodeGen:
-    def __init__(self):
+    def __init__(self, memoize=False, memo_limit=65536, licm=False,
+                 for_loops=False, openmp=False, cse=False,
+                 inline=False, inline_limit=40, inline_budget=200, profile=False,
+                 profile_json=None, infer_types=False, fold=False):
         self.start = '#include <iostream>\n\n'
         self.main = '\nint main()\n{\n'
         self.end = self.indent('return 0;\n}\n', 1)
+        self.memoize = memoize
+        self.memo_limit = memo_limit
+        self.licm = licm
+        self.for_loops = for_loops or openmp
+        self.openmp = openmp
+        self.cse = cse
+        self.inline = inline
+        self.inline_limit = inline_limit
+        self.inline_budget = inline_budget
+        self.profile = profile or profile_json is not None
+        self.profile_json = profile_json
+        self.infer_types = infer_types
+        self.fold = fold
+        self.inferred = {}
+        self.profiled_functions = []
+        self.profiled_loops = {}
+        self.memoized = []
+        self.inlined = []
+        self.stats = {}
 
     def generate(self, variables, ast):
-        code = self.start
+        self.optimize(variables, ast)
+        code = self.includes() + '\n' + self.profile_code()
         for node in ast.children:
             if node.name.type == 'DEF':
                 code += self.function_code(variables, node)
-        code += self.main
-        if '' in variables:
-            for variable in variables['']:
-                code += self.indent(self.type(variable[1]) +
-                                    ' ' + variable[0] + ';\n', 1)
+        code += self.main_code(variables, ast)
+        return code
+
+    def generate_units(self, variables, ast, name, units, placement=None):
+        """ Return dictionary of file names and contents: header with
+            function prototypes and inline functions, up to units translation
+            units with other functions balanced by code size, main.cpp,
+            Makefile and manifest of units of functions. Functions listed in
+            placement read from previous manifest keep their unit, so
+            editing function body changes only its own unit. Editing
+            signature or inline function changes the header and all units.
+        """
+        self.optimize(variables, ast)
+        functions = [node for node in ast.children if node.name.type == 'DEF']
+        guard = re.sub(r'[^A-Za-z0-9_]', '_', name).upper() + '_H'
+        if not guard[0].isalpha():
+            guard = 'UNIT_' + guard
+        header = '#ifndef ' + guard + '\n#define ' + guard + '\n\n'
+        header += self.includes() + '\n' + self.profile_code()
+        for node in functions:
+            header += self.signature(node, node.children[0].name.value) + ';\n'
+        for node in functions:
+            if node.children[0].name.value in self.inlined:
+                header += '\n' + self.function_code(variables, node)
+        header += '\n#endif\n'
+        files = {name + '.h': header}
+        functions = [node for node in functions
+                     if node.children[0].name.value not in self.inlined]
+        names = [node.children[0].name.value for node in functions]
+        codes = [self.function_code(variables, node) for node in functions]
+        if placement is None or placement[0] != units:
+            placement = (units, {})
+        shards = [[] for _ in range(units)]
+        sizes = [0] * units
+        placed = {}
+        for index in range(len(codes)):
+            if names[index] in placement[1]:
+                placed[index] = placement[1][names[index]]
+                sizes[placed[index]] += len(codes[index])
+        for index in sorted(range(len(codes)), key=lambda index: -len(codes[index])):
+            if index not in placed:
+                placed[index] = sizes.index(min(sizes))
+                sizes[placed[index]] += len(codes[index])
+        for index in range(len(codes)):
+            shards[placed[index]].append(index)
+        sources = []
+        for number, shard in enumerate(shards):
+            if shard:
+                sources.append(f'{name}_{number}.cpp')
+                files[sources[-1]] = f'#include "{name}.h"\n\n' + \
+                    ''.join([codes[index] for index in shard])
+        sources.append('main.cpp')
+        files['main.cpp'] = f'#include "{name}.h"\n' + \
+            self.main_code(variables, ast)
+        files['Makefile'] = self.makefile(name, sources)
+        files[name + '.units'] = f'units {units}\n' + ''.join(
+            [f'{names[index]} {placed[index]}\n' for index in range(len(codes))])
+        return files
+
+    def read_placement(self, directory, name):
+        """ Return number of units and dictionary of units of functions
+            from manifest written to directory, or None if there is none
+        """
+        path = os.path.join(directory, name + '.units')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            lines = [line.split() for line in f.read().splitlines()]
+        if not lines or len(lines[0]) != 2 or lines[0][0] != 'units':
+            return None
+        units = int(lines[0][1])
+        return units, {line[0]: int(line[1]) for line in lines[1:]
+                       if len(line) == 2 and 0 <= int(line[1]) < units}
+
+    def write_units(self, files, directory):
+        """ Write files to directory leaving files with unchanged content
+            untouched and remove translation units no longer generated.
+            Returns names of written files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for file_name, content in files.items():
+            path = os.path.join(directory, file_name)
+            if os.path.exists(path):
+                with open(path) as f:
+                    if f.read() == content:
+                        continue
+            with open(path, 'w') as f:
+                f.write(content)
+            written.append(file_name)
+        name = [file_name for file_name in files if file_name.endswith('.h')][0][:-len('.h')]
+        self.stats['removed'] = []
+        for file_name in sorted(os.listdir(directory)):
+            if re.fullmatch(re.escape(name) + r'_[0-9]+\.(cpp|o)', file_name) and \
+                    os.path.splitext(file_name)[0] + '.cpp' not in files:
+                os.remove(os.path.join(directory, file_name))
+                self.stats['removed'].append(file_name)
+        return written
+
+    def makefile(self, name, sources):
+        objects = ' '.join([source[:-len('.cpp')] + '.o' for source in sources])
+        flags = '-std=c++17 -O2 -fopenmp' if self.openmp else '-std=c++17 -O2'
+        code = f'CXXFLAGS ?= {flags}\n'
+        code += f'OBJECTS = {objects}\n\n'
+        code += f'{name}: $(OBJECTS)\n'
+        code += '\t$(CXX) $(CXXFLAGS) -o $@ $(OBJECTS)\n\n'
+        code += f'%.o: %.cpp {name}.h\n'
+        code += '\t$(CXX) $(CXXFLAGS) -c -o $@ $<\n\n'
+        code += '.PHONY: clean\n'
+        code += 'clean:\n'
+        code += f'\trm -f {name} $(OBJECTS)\n'
+        return code
+
+    def optimize(self, variables, ast):
+        self.stats = {}
+        self.memoized = []
+        self.inlined = []
+        if self.fold:
+            self.stats['folded'] = Optimizer().fold_constants(ast)
+            self.stats['pruned'] = Optimizer().prune_branches(ast)
+            self.stats['unused'] = Optimizer().unused_variables(variables, ast)
+        if self.inline:
+            self.stats['substituted'] = Optimizer().substitute_calls(
+                variables, ast, self.inline_budget)
+        if self.cse:
+            self.stats['cse'] = Optimizer().eliminate_common_subexpressions(
+                variables, ast)
+        if self.licm:
+            self.stats['hoisted'] = Optimizer().hoist_invariants(variables, ast)
+        if self.memoize:
+            self.memoized = Optimizer().memoizable_functions(variables, ast)
+            self.stats['memoized'] = self.memoized
+        if self.inline:
+            self.inlined = Optimizer().inline_functions(
+                ast, self.inline_limit, self.memoized)
+            self.stats['inline'] = self.inlined
+        if self.for_loops:
+            self.stats['for loops'], parallel = Optimizer().counted_loops(
+                variables, ast, self.openmp and not self.profile, self.memoized)
+            if self.openmp:
+                self.stats['parallel loops'] = parallel
+        self.profiled_functions = []
+        self.profiled_loops = {}
+        if self.profile:
+            self.profiled_functions = [node for node in ast.children
+                                       if node.name.type == 'DEF']
+            for node in ast.descendants:
+                if node.name.type in ('WHILE', 'FOR'):
+                    self.profiled_loops[node] = len(self.profiled_loops)
+        self.inferred = {}
+        if self.infer_types:
+            self.inferred, self.stats['overflow'] = Optimizer().infer_types(
+                variables, ast)
+            self.stats['int64'] = [name if not scope else f'{scope}.{name}' if name else f'{scope}()'
+                                   for (scope, name), type in self.inferred.items() if type == 'int64_t']
+            functions = Optimizer().functions(ast)
+            self.memoized = [name for name in self.memoized if len(functions[name].children[0].children) == 1 or
+                             'int64_t' not in [self.inferred.get((name, param)) for param, _ in
+                                               Optimizer().params(functions[name])]]
+            if self.memoize:
+                self.stats['memoized'] = self.memoized
+
+    def includes(self):
+        code = self.start
+        if self.memoized:
+            code = '#include <unordered_map>\n' + code
+        if self.memoized or 'int64_t' in self.inferred.values() or 'int32_t' in self.inferred.values():
+            code = '#include <cstdint>\n' + code
+        if self.profile:
+            code = '#include <chrono>\n#include <cstdio>\n' + code
+        return code[:-1]
+
+    def profile_code(self):
+        """ Return counters of function calls, time and loop iterations
+            written to stderr or JSON file at program exit
+        """
+        if not self.profile:
+            return ''
+        code = 'struct profile_function\n{\n'
+        code += self.indent('const char *name;\n', 1)
+        code += self.indent('int line;\n', 1)
+        code += self.indent('unsigned long long calls;\n', 1)
+        code += self.indent('int depth;\n', 1)
+        code += self.indent('std::chrono::steady_clock::duration time;\n', 1)
+        code += '};\n\n'
+        code += 'struct profile_loop\n{\n'
+        code += self.indent('int line;\n', 1)
+        code += self.indent('unsigned long long iterations;\n', 1)
+        code += '};\n\n'
+        functions = ', '.join([f'{{"{node.children[0].name.value}", {node.name.line}, 0, 0, {{}}}}'
+                               for node in self.profiled_functions] + ['{nullptr, 0, 0, 0, {}}'])
+        code += f'inline profile_function profile_functions[] = {{{functions}}};\n'
+        loops = ', '.join([f'{{{node.name.line}, 0}}'
+                           for node in self.profiled_loops] + ['{0, 0}'])
+        code += f'inline profile_loop profile_loops[] = {{{loops}}};\n\n'
+        code += 'struct profile_scope\n{\n'
+        code += self.indent('profile_function &function;\n', 1)
+        code += self.indent('std::chrono::steady_clock::time_point start;\n', 1)
+        code += self.indent('profile_scope(profile_function &function) : function(function), '
+                            'start(std::chrono::steady_clock::now())\n', 1)
+        code += self.indent('{\n', 1)
+        code += self.indent('function.calls++;\n', 2)
+        code += self.indent('function.depth++;\n', 2)
+        code += self.indent('}\n', 1)
+        code += self.indent('~profile_scope()\n', 1)
+        code += self.indent('{\n', 1)
+        code += self.indent('if(--function.depth == 0)\n', 2)
+        code += self.indent('{\n', 2)
+        code += self.indent('function.time += std::chrono::steady_clock::now() - start;\n', 3)
+        code += self.indent('}\n', 2)
+        code += self.indent('}\n', 1)
+        code += '};\n\n'
+        code += 'struct profile_report\n{\n'
+        code += self.indent('~profile_report()\n', 1)
+        code += self.indent('{\n', 1)
+        if self.profile_json is None:
+            code += self.indent('for(profile_function *f = profile_functions; f->name; f++)\n', 2)
+            code += self.indent('{\n', 2)
+            code += self.indent('std::fprintf(stderr, "profile: function %s (line %d): %llu calls, %.6f s\\n", '
+                                'f->name, f->line, f->calls, std::chrono::duration<double>(f->time).count());\n', 3)
+            code += self.indent('}\n', 2)
+            code += self.indent('for(profile_loop *l = profile_loops; l->line; l++)\n', 2)
+            code += self.indent('{\n', 2)
+            code += self.indent('std::fprintf(stderr, "profile: loop (line %d): %llu iterations\\n", '
+                                'l->line, l->iterations);\n', 3)
+            code += self.indent('}\n', 2)
+        else:
+            path = self.profile_json.replace('\\', '\\\\').replace('"', '\\"')
+            code += self.indent(f'std::FILE *file = std::fopen("{path}", "w");\n', 2)
+            code += self.indent('if(!file)\n', 2)
+            code += self.indent('{\n', 2)
+            code += self.indent('return;\n', 3)
+            code += self.indent('}\n', 2)
+            code += self.indent('std::fprintf(file, "{\\"functions\\": [");\n', 2)
+            code += self.indent('for(profile_function *f = profile_functions; f->name; f++)\n', 2)
+            code += self.indent('{\n', 2)
+            code += self.indent('std::fprintf(file, "%s{\\"name\\": \\"%s\\", \\"line\\": %d, \\"calls\\": %llu, '
+                                '\\"seconds\\": %.9f}", f == profile_functions ? "" : ", ", f->name, f->line, f->calls, '
+                                'std::chrono::duration<double>(f->time).count());\n', 3)
+            code += self.indent('}\n', 2)
+            code += self.indent('std::fprintf(file, "], \\"loops\\": [");\n', 2)
+            code += self.indent('for(profile_loop *l = profile_loops; l->line; l++)\n', 2)
+            code += self.indent('{\n', 2)
+            code += self.indent('std::fprintf(file, "%s{\\"line\\": %d, \\"iterations\\": %llu}", '
+                                'l == profile_loops ? "" : ", ", l->line, l->iterations);\n', 3)
+            code += self.indent('}\n', 2)
+            code += self.indent('std::fprintf(file, "]}\\n");\n', 2)
+            code += self.indent('std::fclose(file);\n', 2)
+        code += self.indent('}\n', 1)
+        code += '};\n\n'
+        code += 'inline profile_report profile_report_instance;\n\n'
+        return code
+
+    def main_code(self, variables, ast):
+        code = self.main
+        code += self.declarations(variables, '', 1)
         code += self.block(ast, 1)
         code += self.end
         return code
@@ -31,6 +309,8 @@ class CodeGen:
                 code += self.assignment_code(node, indent)
             elif node.name.type == 'WHILE':
                 code += self.while_code(node, indent)
+            elif node.name.type == 'FOR':
+                code += self.for_code(node, indent)
             elif node.name.type == 'IF':
                 code += self.if_code(node, indent)
             elif node.name.type == 'PRINT':
@@ -44,21 +324,86 @@ class CodeGen:
 
     def function_code(self, variables, ast):
         function_name = ast.children[0].name.value
-        code = self.type(ast.children[1].name.type) + ' ' + function_name + '('
-        code += (', '.join([self.type(arg.children[0].name.type) +
-                            ' ' + arg.name.value for arg in ast.children[0].children]))
-        code += ')\n{\n'
+        if function_name in self.memoized:
+            code = self.signature(ast, function_name) + ';\n\n'
+            code += self.signature(ast, function_name + '_memo_body')
+        else:
+            code = self.signature(ast, function_name)
+        code += '\n{\n'
         indent = 1
-        if function_name in variables:
-            for variable in variables[function_name]:
-                code += self.indent(self.type(variable[1]) +
-                                    ' ' + variable[0] + ';\n', indent)
+        code += self.declarations(variables, function_name, indent)
+        if function_name not in self.memoized:
+            code += self.function_profile_code(ast, indent)
         code += self.block(ast.children[2], indent)
         code += '}\n'
+        if function_name in self.memoized:
+            code += '\n' + self.memo_code(ast)
+        return code
+
+    def function_profile_code(self, ast, indent):
+        """ Return counter of calls and time of profiled function, for
+            memoized function placed before cache lookup to count all calls
+        """
+        if ast not in self.profiled_functions:
+            return ''
+        return self.indent('profile_scope profile_guard(profile_functions[' +
+                           str(self.profiled_functions.index(ast)) + ']);\n', indent)
+
+    def declarations(self, variables, scope, indent):
+        """ Return declarations of variables of the scope, each declared
+            once when types are inferred
+        """
+        code = ''
+        declared = []
+        for name, type in variables.get(scope, []):
+            if self.infer_types and name in declared:
+                continue
+            declared.append(name)
+            code += self.indent(self.variable_type(scope, name, type) +
+                                ' ' + name + ';\n', indent)
+        return code
+
+    def signature(self, ast, function_name):
+        name = ast.children[0].name.value
+        code = self.variable_type(name, None, ast.children[1].name.type) + ' ' + function_name + '('
+        if function_name in self.inlined:
+            code = 'static inline ' + code
+        code += (', '.join([self.variable_type(name, arg.name.value, arg.children[0].name.type) +
+                            ' ' + arg.name.value for arg in ast.children[0].children]))
+        return code + ')'
+
+    def memo_code(self, ast):
+        function_name = ast.children[0].name.value
+        return_type = self.variable_type(function_name, None, ast.children[1].name.type)
+        args = [arg.name.value for arg in ast.children[0].children]
+        key = ' << 32 | '.join(['(std::uint64_t)' + arg if self.inferred.get((function_name, arg)) == 'int64_t'
+                                else '(std::uint64_t)(std::uint32_t)' + arg for arg in args])
+        code = self.signature(ast, function_name) + '\n{\n'
+        code += self.function_profile_code(ast, 1)
+        code += self.indent('static std::unordered_map<std::uint64_t, ' +
+                            return_type + '> memo_table;\n', 1)
+        code += self.indent('std::uint64_t memo_key = ' + key + ';\n', 1)
+        code += self.indent('auto memo_found = memo_table.find(memo_key);\n', 1)
+        code += self.indent('if(memo_found != memo_table.end())\n', 1)
+        code += self.indent('{\n', 1)
+        code += self.indent('return memo_found->second;\n', 2)
+        code += self.indent('}\n', 1)
+        code += self.indent(return_type + ' memo_result = ' + function_name + '_memo_body(' +
+                            ', '.join(args) + ');\n', 1)
+        code += self.indent('if(memo_table.size() < ' +
+                            str(self.memo_limit) + ')\n', 1)
+        code += self.indent('{\n', 1)
+        code += self.indent('memo_table.emplace(memo_key, memo_result);\n', 2)
+        code += self.indent('}\n', 1)
+        code += self.indent('return memo_result;\n', 1)
+        code += '}\n'
         return code
 
     def assignment_code(self, ast, indent):
-        return self.indent(ast.children[0].name.value + ' = ' + self.expression_code(ast.children[1]) + ';\n', indent)
+        return self.indent(self.assignment_expression(ast) + ';\n', indent)
+
+    def assignment_expression(self, ast):
+        return ast.children[0].name.value + ' = ' + self.expression_code(ast.children[1])
 
     def return_code(self, ast, indent):
         return self.indent('return ' + self.expression_code(ast.children[0]) + ';\n', indent)
@@ -67,21 +412,52 @@ class CodeGen:
         code = self.indent(
             'while(' + self.expression_code(ast.children[0]) + ')\n', indent) + self.indent('{\n', indent)
         indent += 1
+        code += self.loop_profile_code(ast, indent)
         code += self.block(ast.children[1], indent)
         indent -= 1
         code += self.indent('}\n', indent)
         return code
 
-    def if_code(self, ast, indent):
+    def loop_profile_code(self, ast, indent):
+        if ast not in self.profiled_loops:
+            return ''
+        return self.indent('profile_loops[' + str(self.profiled_loops[ast]) + '].iterations++;\n', indent)
+
+    def for_code(self, ast, indent):
+        code = ''
+        if ast.name.value is not None:
+            code += self.assignment_code(ast.children[0], indent)
+            code += self.indent('if(' + self.expression_code(ast.children[1]) + ')\n', indent)
+            code += self.indent('{\n', indent)
+            indent += 1
+            code += self.indent(
+                ('#pragma omp parallel for ' + ast.name.value).rstrip() + '\n', indent)
+        init = ''
+        if ast.children[0].name.type == 'EQUALS':
+            init = self.assignment_expression(ast.children[0])
+        code += self.indent('for(' + init + '; ' + self.expression_code(ast.children[1]) + '; ' +
+                            self.assignment_expression(ast.children[2]) + ')\n', indent)
+        code += self.indent('{\n', indent)
+        indent += 1
+        code += self.loop_profile_code(ast, indent)
+        code += self.block(ast.children[3], indent)
+        indent -= 1
+        code += self.indent('}\n', indent)
+        if ast.name.value is not None:
+            indent -= 1
+            code += self.indent('}\n', indent)
+        return code
+
+    def if_code(self, ast, indent, keyword='if'):
         code = self.indent(
-            'if(' + self.expression_code(ast.children[0]) + ')\n', indent) + self.indent('{\n', indent)
+            keyword + '(' + self.expression_code(ast.children[0]) + ')\n', indent) + self.indent('{\n', indent)
         indent += 1
         code += self.block(ast.children[1], indent)
         indent -= 1
         code += self.indent('}\n', indent)
         if len(ast.children) >= 3:
             if ast.children[2].name.type == 'IF':
-                code += self.if_code(ast.children[2], indent)
+                code += self.if_code(ast.children[2], indent, 'else if')
             else:
                 code += self.else_code(ast.children[2], indent)
         return code
@@ -134,6 +510,8 @@ class CodeGen:
             return str(token.value)
         elif token.type == 'NOT':
             return '!'
+        elif token.type == 'CAST':
+            return '(' + token.value + ')'
         elif token.type == 'PLUS':
             return '+'
         elif token.type == 'MINUS':
@@ -161,6 +539,12 @@ class CodeGen:
         elif token.type == 'ISEQUALMORE':
             return '>='
 
+    def variable_type(self, scope, name, type):
+        """ Return inferred C++ type of variable, parameter or, for name
+            None, function result, or C++ type of its declared type
+        """
+        return self.inferred.get((scope, name)) or self.type(type)
+
     def type(self, type):
         if type == 'INT':
             return 'int'
@@ -172,23 +556,113 @@ class CodeGen:
             return 'void'
 
 
+def add_codegen_arguments(parser):
+    """ Add options of code generation to argument parser
+    """
+    parser.add_argument('--fold', action='store_true',
+                        help='fold constant operations, remove constant branches and unused declarations')
+    parser.add_argument('--memoize', action='store_true',
+                        help='memoize pure functions with int or bool parameters')
+    parser.add_argument('--memo-limit', type=int, default=65536,
+                        help='maximum number of cached results per memoized function')
+    parser.add_argument('--licm', action='store_true',
+                        help='hoist loop invariant expressions out of while loops')
+    parser.add_argument('--cse', action='store_true',
+                        help='compute repeated expressions once into temporaries')
+    parser.add_argument('--for-loops', action='store_true',
+                        help='emit counted while loops as for loops')
+    parser.add_argument('--openmp', action='store_true',
+                        help='mark independent counted loops with OpenMP pragmas')
+    parser.add_argument('--inline', action='store_true',
+                        help='inline small non-recursive functions')
+    parser.add_argument('--inline-limit', type=int, default=40,
+                        help='maximum number of AST nodes of function emitted as static inline')
+    parser.add_argument('--inline-budget', type=int, default=200,
+                        help='maximum number of AST nodes added by substituting calls')
+    parser.add_argument('--profile', action='store_true',
+                        help='instrument functions and loops, report to stderr at exit')
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help='instrument functions and loops, report to JSON file at exit')
+    parser.add_argument('--infer-types', action='store_true',
+                        help='choose int32_t, int64_t or double from inferred value ranges')
+
+
+def codegen_options(args):
+    """ Return keyword arguments of CodeGen from parsed arguments
+    """
+    return {'memoize': args.memoize, 'memo_limit': args.memo_limit, 'licm': args.licm,
+            'for_loops': args.for_loops, 'openmp': args.openmp, 'cse': args.cse,
+            'inline': args.inline, 'inline_limit': args.inline_limit,
+            'inline_budget': args.inline_budget, 'profile': args.profile,
+            'profile_json': args.profile_json, 'infer_types': args.infer_types, 'fold': args.fold}
+
+
 if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print(
-            f'Usage: python {sys.argv[0]} <input file path> <output file path>')
-        sys.exit(1)
-    with open(sys.argv[1]) as f:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('input', help='input file path')
+    arg_parser.add_argument('output', nargs='?',
+                            help='output file path or directory with --units')
+    arg_parser.add_argument('--check', action='store_true',
+                            help='only check if input lexes and parses')
+    arg_parser.add_argument('--recover', action='store_true',
+                            help='report all lexical and syntax errors instead of the first one')
+    add_codegen_arguments(arg_parser)
+    arg_parser.add_argument('--units', type=int, default=0,
+                            help='split output into header, UNITS translation units, main.cpp and Makefile')
+    arg_parser.add_argument('--stats', action='store_true',
+                            help='print optimization report to stderr')
+    args = arg_parser.parse_args()
+    if args.output is None and not args.check:
+        arg_parser.error('the following arguments are required: output')
+    with open(args.input) as f:
         data = f.read()
-    lexer = Lexer()
-    parser = Parser()
-    code_generator = CodeGen()
+    if args.check and not args.recover:
+        try:
+            Recognizer().check(data)
+        except LexerError as le:
+            print(f'lexical error: line {le.line}')
+            sys.exit(1)
+        except ParserError as pe:
+            print(f'syntax error: token {pe.token}, line {pe.token.line}')
+            sys.exit(1)
+        sys.exit(0)
+    lexer = Lexer(recover=args.recover)
+    parser = Parser(recover=args.recover)
+    code_generator = CodeGen(**codegen_options(args))
     lexer.input(data)
     try:
-        output_code = code_generator.generate(*parser.parse(lexer.tokens()))
-        print(output_code)
+        variables, ast = parser.parse(lexer.tokens())
+        errors = sorted(lexer.errors + parser.errors,
+                        key=lambda error: error.line)
+        for error in errors:
+            if isinstance(error, LexerError):
+                print(f'lexical error: line {error.line}')
+            else:
+                print(f'syntax error: token {error.token}, line {error.line}, '
+                      f'expected {", ".join(error.expected)}')
+        if errors:
+            sys.exit(1)
+        if args.check:
+            sys.exit(0)
+        if args.units > 0:
+            name = os.path.splitext(os.path.basename(args.input))[0]
+            files = code_generator.generate_units(
+                variables, ast, name, args.units,
+                code_generator.read_placement(args.output, name))
+            code_generator.stats['written'] = code_generator.write_units(
+                files, args.output)
+        else:
+            output_code = code_generator.generate(variables, ast)
+            print(output_code)
     except LexerError as le:
         print(f'lexical error: line {le.line}')
+        sys.exit(1)
     except ParserError as pe:
         print(f'syntax error: token {pe.token}, line {pe.token.line}')
-    with open(sys.argv[2], 'w') as f:
-        f.write(output_code)
+        sys.exit(1)
+    if args.stats:
+        for name, value in code_generator.stats.items():
+            print(f'{name}: {", ".join(value)}', file=sys.stderr)
+    if args.units <= 0:
+        with open(args.output, 'w') as f:
+            f.write(output_code)
@@ -1,6 +1,8 @@
 import re
 import sys
 
+import numpy as np
+
 
 class Token:
     """ Token containing position in file,
@@ -31,8 +33,134 @@ class LexerError(Exception):
         self.line = line
 
 
+class LineIndex:
+    """ Line table of the buffer: start offset, indent depth and blank
+        flag of every line, and state in which sequential tokenizing
+        reaches the line. Newlines are found in bounded chunks of the
+        UTF-8 bytes and indents by scanning forward from line starts, so
+        memory beyond the encoded buffer is proportional to line count.
+    """
+    chunk = 1 << 20
+    block = 1 << 12
+    spaces = np.zeros(256, dtype=bool)
+    spaces[list(b' \t\r\x0b\x0c\x1c\x1d\x1e\x1f')] = True
+
+    def __init__(self, buffer):
+        ascii = buffer.isascii()
+        codes = np.frombuffer(buffer.encode('ascii' if ascii else 'utf-8'), dtype=np.uint8)
+        self.length = len(buffer)
+        count = sum([int(np.count_nonzero(codes[begin:begin + self.chunk] == ord('\n')))
+                     for begin in range(0, len(codes), self.chunk)])
+        byte_starts = np.zeros(count + 1, dtype=np.int64)
+        self.starts = byte_starts if ascii else np.zeros(count + 1, dtype=np.int64)
+        line = 1
+        continuations = 0
+        for begin in range(0, len(codes), self.chunk):
+            part = codes[begin:begin + self.chunk]
+            found = np.flatnonzero(part == ord('\n'))
+            byte_starts[line:line + len(found)] = found + (begin + 1)
+            if not ascii:
+                counts = np.cumsum((part & 0xC0) == 0x80, dtype=np.int32)
+                self.starts[line:line + len(found)] = found + \
+                    (begin + 1 - continuations) - counts[found]
+                continuations += int(counts[-1])
+            line += len(found)
+        self.indents = np.zeros(len(byte_starts), dtype=np.int32)
+        self.blanks = np.zeros(len(byte_starts), dtype=bool)
+        leads = np.zeros(len(byte_starts), dtype=np.int32)
+        contents = np.zeros(len(byte_starts), dtype=bool)
+        for begin in range(0, len(byte_starts), self.chunk):
+            lines = byte_starts[begin:begin + self.chunk]
+            indents = self.indents[begin:begin + self.chunk]
+            active = np.flatnonzero(lines < len(codes))
+            while len(active):
+                active = active[codes[lines[active] + indents[active]] == ord('\t')]
+                indents[active] += 1
+                active = active[lines[active] + indents[active] < len(codes)]
+            first = lines + indents
+            inside = first < len(codes)
+            blanks = self.blanks[begin:begin + self.chunk]
+            blanks[:] = ~inside
+            blanks[inside] = codes[first[inside]] == ord('\n')
+            lead = leads[begin:begin + self.chunk]
+            active = np.flatnonzero(lines < len(codes))
+            while len(active):
+                active = active[self.spaces[codes[lines[active] + lead[active]]]]
+                lead[active] += 1
+                active = active[lines[active] + lead[active] < len(codes)]
+            first = lines + lead
+            inside = first < len(codes)
+            contents[begin:begin + self.chunk][inside] = codes[first[inside]] != ord('\n')
+        self.state(byte_starts, codes, leads, contents)
+        self.blocks = np.searchsorted(self.starts, np.arange(
+            0, self.length + 3 * self.block, self.block))
+
+    def state(self, byte_starts, codes, leads, contents):
+        """ Find offset, line number and indent depth at which sequential
+            tokenizing continues from every line. Newline is a token
+            boundary only after a token or after other such newline and
+            its tabs, else it is consumed with surrounding whitespace, the
+            line number is not incremented and tokenizing continues at the
+            next character which is not whitespace.
+        """
+        numbers = np.arange(len(byte_starts))
+        ends = byte_starts[1:] - 1
+        before = codes[np.maximum(ends - 1, 0)]
+        bounds = np.ones(len(byte_starts), dtype=bool)
+        bounds[1:] = ~self.spaces[before] & (before != ord('\n'))
+        if len(ends):
+            bounds[1] = ends[0] == 0 if self.blanks[0] else bounds[1]
+        follows = np.where(~self.blanks[:-1] | (numbers[:-1] == 0), numbers[:-1], 0)
+        bounds[1:] = bounds[1:][np.maximum.accumulate(follows)]
+        self.lines = np.cumsum(bounds)
+        depths = self.indents.copy()
+        depths[0] = 0
+        self.depths = depths[np.maximum.accumulate(np.where(bounds, numbers, 0))]
+        following = np.where(contents, numbers, len(numbers))
+        following = np.minimum.accumulate(following[::-1])[::-1]
+        skipped = np.append(self.starts, self.length)[following] + \
+            np.append(leads, 0)[following]
+        self.offsets = np.where(bounds, self.starts + self.indents, skipped)
+        self.offsets[0] = 0
+
+    def __len__(self):
+        return len(self.starts)
+
+    def start(self, line):
+        """ Return buffer offset of the first character of the line
+        """
+        return int(self.starts[line - 1])
+
+    def indent(self, line):
+        """ Return number of leading tabs in the line
+        """
+        return int(self.indents[line - 1])
+
+    def blank(self, line):
+        """ Return True if the line contains only tabs
+        """
+        return bool(self.blanks[line - 1])
+
+    def resume(self, line):
+        """ Return offset, line number and indent depth at which
+            sequential tokenizing continues from the beginning of the line
+        """
+        return (int(self.offsets[line - 1]), int(self.lines[line - 1]), int(self.depths[line - 1]))
+
+    def line(self, pos):
+        """ Return line containing buffer offset. Only newlines of the
+            block of the offset are searched, which takes constant time.
+        """
+        end = pos + 1
+        low, high = self.blocks[end // self.block], self.blocks[end // self.block + 1]
+        return int(low + np.searchsorted(self.starts[low:high], end, side='right'))
+
+
 class Lexer:
-    def __init__(self):
+    def __init__(self, recover=False):
+        """ In recover mode unrecognized characters are skipped
+            and collected as LexerError in errors
+        """
         tokens = [
             (r'def', 'DEF'),
             (r'if', 'IF'),
@@ -71,11 +199,16 @@ class Lexer:
             (r'[a-zA-Z_][a-zA-Z0-9_]*', 'IDENTIFIER')
         ]
         self.buffer = None
+        self.recover = recover
+        self.errors = []
         self.patterns = []
         for pattern, type in tokens:
             self.patterns.append((re.compile(pattern), type))
         self.whitespace = re.compile(r'\s+')
         self.newline = re.compile(r'\n\t*')
+        self.types = [None, 'NEWLINE', None] + [type for _, type in tokens]
+        self.master = re.compile('|'.join(
+            [r'(\n\t*)', r'(\s+)'] + [f'({pattern})' for pattern, _ in tokens]))
 
     def input(self, buffer):
         """ Initialize buffer as lexer input
@@ -84,44 +217,70 @@ class Lexer:
         self.pos = 0
         self.line = 1
         self.indend = 0
+        self.index = None
+        self.errors = []
+
+    def line_index(self):
+        """ Return line index of the buffer, building it on first use
+        """
+        if self.index is None:
+            self.index = LineIndex(self.buffer)
+        return self.index
+
+    def seek(self, line):
+        """ Move to the beginning of the line. Position, line number and
+            indentation state are set as if all previous lines were
+            already tokenized, so tokens() yields the rest of the tokens
+            of sequential tokenizing without the newline of the line.
+        """
+        index = self.line_index()
+        if line < 1 or line > len(index):
+            raise LexerError(line)
+        self.pos, self.line, self.indend = index.resume(line)
 
     def token(self):
         """ Return next token in the buffer. If no matching token is found,
             LexerError is raised. Returns None if end of buffer is reached.
         """
-        if self.buffer is None or self.pos >= len(self.buffer):
-            return None
-        newline = self.newline.match(self.buffer, self.pos)
-        if newline:
-            self.line += 1
-            self.pos = newline.end()
-            prev_indend = self.indend
-            self.indend = newline.end() - newline.start() - 1
-            if self.indend < prev_indend:
-                return Token(self.line, 'DEDENT')
-            elif self.indend > prev_indend:
-                return Token(self.line, 'INDENT')
-            else:
-                return Token(self.line, 'NEWLINE')
-        whitespace = self.whitespace.match(self.buffer, self.pos)
-        if whitespace:
-            self.pos = whitespace.end()
-            if self.pos >= len(self.buffer):
+        while True:
+            if self.buffer is None or self.pos >= len(self.buffer):
                 return None
-        for pattern, type in self.patterns:
-            matched = pattern.match(self.buffer, self.pos)
-            if matched:
-                self.pos = matched.end()
-                if type == 'VALUE_INT':
-                    return Token(self.line, type, int(matched.group(0)))
-                if type == 'VALUE_FLOAT':
-                    return Token(self.line, type, float(matched.group(0)))
-                if type == 'VALUE_BOOL':
-                    return Token(self.line, type, matched.group(0) == 'True')
-                if type == 'IDENTIFIER':
-                    return Token(self.line, type, matched.group(0))
-                return Token(self.line, type)
-        raise LexerError(self.line)
+            newline = self.newline.match(self.buffer, self.pos)
+            if newline:
+                self.line += 1
+                self.pos = newline.end()
+                prev_indend = self.indend
+                self.indend = newline.end() - newline.start() - 1
+                if self.indend < prev_indend:
+                    return Token(self.line, 'DEDENT')
+                elif self.indend > prev_indend:
+                    return Token(self.line, 'INDENT')
+                else:
+                    return Token(self.line, 'NEWLINE')
+            whitespace = self.whitespace.match(self.buffer, self.pos)
+            if whitespace:
+                self.pos = whitespace.end()
+                if self.pos >= len(self.buffer):
+                    return None
+            for pattern, type in self.patterns:
+                matched = pattern.match(self.buffer, self.pos)
+                if matched:
+                    self.pos = matched.end()
+                    if type == 'VALUE_INT':
+                        return Token(self.line, type, int(matched.group(0)))
+                    if type == 'VALUE_FLOAT':
+                        return Token(self.line, type, float(matched.group(0)))
+                    if type == 'VALUE_BOOL':
+                        return Token(self.line, type, matched.group(0) == 'True')
+                    if type == 'IDENTIFIER':
+                        return Token(self.line, type, matched.group(0))
+                    return Token(self.line, type)
+            if not self.recover:
+                raise LexerError(self.line)
+            self.errors.append(LexerError(self.line))
+            self.pos += 1
+            while self.pos < len(self.buffer) and not self.master.match(self.buffer, self.pos):
+                self.pos += 1
 
     def tokens(self):
         """ Returns iterator to tokens in the input buffer
@@ -131,6 +290,46 @@ class Lexer:
             yield token
             token = self.token()
 
+    def scan(self):
+        """ Returns iterator to (type, value, line) tuples of tokens in the
+            input buffer. Yields the same tokens as tokens() using a single
+            combined pattern and without creating Token objects.
+        """
+        buffer = self.buffer or ''
+        match = self.master.match
+        types = self.types
+        pos = 0
+        line = 1
+        indend = 0
+        while pos < len(buffer):
+            matched = match(buffer, pos)
+            if matched is None:
+                raise LexerError(line)
+            pos = matched.end()
+            group = matched.lastindex
+            if group == 1:
+                line += 1
+                prev_indend = indend
+                indend = pos - matched.start() - 1
+                if indend < prev_indend:
+                    yield ('DEDENT', None, line)
+                elif indend > prev_indend:
+                    yield ('INDENT', None, line)
+                else:
+                    yield ('NEWLINE', None, line)
+            elif group != 2:
+                type = types[group]
+                if type == 'IDENTIFIER':
+                    yield (type, matched.group(), line)
+                elif type == 'VALUE_INT':
+                    yield (type, int(matched.group()), line)
+                elif type == 'VALUE_FLOAT':
+                    yield (type, float(matched.group()), line)
+                elif type == 'VALUE_BOOL':
+                    yield (type, matched.group() == 'True', line)
+                else:
+                    yield (type, None, line)
+
 
 if __name__ == '__main__':
     lexer = Lexer()
@@ -0,0 +1,1133 @@
+import math
+
+from anytree import Node, PreOrderIter, PostOrderIter
+
+from transpiler.lexer import *
+
+
+class Optimizer:
+    def __init__(self):
+        self.precedence = {
+            'OR': 1,
+            'AND': 2,
+            'ISEQUAL': 3,
+            'ISNOTEQUAL': 3,
+            'ISLESS': 4,
+            'ISEQUALLESS': 4,
+            'ISMORE': 4,
+            'ISEQUALMORE': 4,
+            'PLUS': 5,
+            'MINUS': 5,
+            'MULTIPLY': 6,
+            'DIVIDE': 6,
+            'MODULO': 6
+        }
+
+    def functions(self, ast):
+        """ Return top level function definitions by name in source order
+        """
+        return {node.children[0].name.value: node for node in ast.children
+                if node.name.type == 'DEF'}
+
+    def params(self, function):
+        """ Return list of (name, type) of function parameters
+        """
+        return [(arg.name.value, arg.children[0].name.type)
+                for arg in function.children[0].children]
+
+    def callees(self, ast):
+        """ Return names of functions called inside the subtree
+        """
+        return {node.children[0].name.value for node in PreOrderIter(ast)
+                if node.name.type == 'RETURN_TYPE'}
+
+    def reads(self, ast):
+        """ Return names of variables read inside the subtree
+        """
+        return {node.name.value for node in PreOrderIter(ast) if self.read(node)}
+
+    def read(self, node):
+        """ Check if node is an identifier read as variable
+        """
+        if node.name.type != 'IDENTIFIER' or node.parent is None:
+            return False
+        return node.parent.name.type not in ('EQUALS', 'RETURN_TYPE') or node.parent.children[0] is not node
+
+    def writes(self, ast):
+        """ Return names of variables assigned inside the subtree
+        """
+        return {node.children[0].name.value for node in PreOrderIter(ast)
+                if node.name.type == 'EQUALS'}
+
+    def single_scope(self, variables, function):
+        """ Check if function touches only its own parameters and locals
+            and has no side effects other than its return value
+        """
+        name = function.children[0].name.value
+        body = function.children[2]
+        for node in PreOrderIter(body):
+            if node.name.type in ('PRINT', 'DEF'):
+                return False
+        local = {param for param, _ in self.params(function)}
+        local |= {variable[0] for variable in variables.get(name, [])}
+        local |= self.writes(body)
+        return self.reads(body) <= local
+
+    def pure_functions(self, variables, ast):
+        """ Return names of functions without side effects which
+            call only other pure functions
+        """
+        functions = self.functions(ast)
+        pure = {name for name, node in functions.items()
+                if self.single_scope(variables, node)}
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not self.callees(functions[name].children[2]) <= pure:
+                    pure.remove(name)
+                    changed = True
+        return pure
+
+    def memoizable_functions(self, variables, ast):
+        """ Return names of pure functions returning a value and taking
+            one or two int or bool parameters
+        """
+        pure = self.pure_functions(variables, ast)
+        memoizable = []
+        for name, function in self.functions(ast).items():
+            params = self.params(function)
+            if name not in pure or function.children[1].name.type == 'NONE':
+                continue
+            if not 1 <= len(params) <= 2:
+                continue
+            if all(type in ('INT', 'BOOL') for _, type in params):
+                memoizable.append(name)
+        return memoizable
+
+    def names(self, variables, ast):
+        """ Return all identifiers used in the program
+        """
+        names = {node.name.value for node in ast.descendants
+                 if node.name.type == 'IDENTIFIER'}
+        for scope in variables.values():
+            names |= {variable[0] for variable in scope}
+        return names
+
+    def scope(self, node):
+        """ Return name of function containing the node or '' for main
+        """
+        for ancestor in node.ancestors[1:]:
+            if ancestor.name.type == 'DEF':
+                return ancestor.children[0].name.value
+        return ''
+
+    def types(self, variables, ast, scope):
+        """ Return declared types of variables visible in the scope
+        """
+        types = {}
+        if scope:
+            types.update(self.params(self.functions(ast)[scope]))
+        types.update({variable[0]: variable[1]
+                      for variable in variables.get(scope, [])})
+        return types
+
+    def expression_tree(self, elements):
+        """ Return operator tree of flat operation as nested tuples
+            (start, end, left, right) using C++ operator precedence.
+            Operator of inner node is at index left[1].
+        """
+        start = 2 if elements[0].type == 'NOT' else 1
+        tree, _ = self.climb(elements, (0, start, None, None), start, 1)
+        return tree
+
+    def climb(self, elements, left, pos, min_precedence):
+        while pos < len(elements) and self.precedence[elements[pos].type] >= min_precedence:
+            precedence = self.precedence[elements[pos].type]
+            right = (pos + 1, pos + 2, None, None)
+            pos += 2
+            while pos < len(elements) and self.precedence[elements[pos].type] > precedence:
+                right, pos = self.climb(
+                    elements, right, pos, precedence + 1)
+            left = (left[0], right[1], left, right)
+        return left, pos
+
+    def expression_type(self, elements, tree, types):
+        """ Return type of operation subtree or None if unknown
+        """
+        start, end, left, right = tree
+        if left is None:
+            if elements[start].type == 'NOT':
+                return 'BOOL'
+            if elements[start].type == 'IDENTIFIER':
+                return types.get(elements[start].value)
+            return elements[start].type[len('VALUE_'):]
+        if self.precedence[elements[left[1]].type] <= 4:
+            return 'BOOL'
+        operand_types = (self.expression_type(elements, left, types),
+                         self.expression_type(elements, right, types))
+        if None in operand_types:
+            return None
+        return 'FLOAT' if 'FLOAT' in operand_types else 'INT'
+
+    def side_effect_free(self, ast, pure):
+        """ Check if every call inside the subtree is a pure function call
+        """
+        return self.callees(ast) <= pure
+
+    def loop_expressions(self, block, guaranteed, found):
+        """ Collect expressions evaluated in the block with information
+            if they are evaluated whenever the block is executed
+        """
+        for statement in block.children:
+            if statement.name.type == 'EQUALS':
+                found.append((statement.children[1], guaranteed))
+            elif statement.name.type in ('PRINT', 'RETURN'):
+                found.extend([(arg, guaranteed)
+                              for arg in statement.children])
+            elif statement.name.type == 'WHILE':
+                found.append((statement.children[0], guaranteed))
+                self.loop_expressions(statement.children[1], False, found)
+            elif statement.name.type == 'IF':
+                self.if_expressions(statement, guaranteed, found)
+
+    def if_expressions(self, ast, guaranteed, found):
+        found.append((ast.children[0], guaranteed))
+        self.loop_expressions(ast.children[1], False, found)
+        if len(ast.children) >= 3:
+            if ast.children[2].name.type == 'IF':
+                self.if_expressions(ast.children[2], False, found)
+            else:
+                self.loop_expressions(ast.children[2], False, found)
+
+    def speculation_safe(self, elements):
+        """ Check if operation may be evaluated even when the original
+            program would not evaluate it
+        """
+        return all(element.type not in ('DIVIDE', 'MODULO') for element in elements)
+
+    def invariant_spans(self, elements, tree, written, guaranteed, types, spans):
+        """ Collect maximal loop invariant subexpressions of operation
+        """
+        start, end, left, right = tree
+        if left is None:
+            return
+        invariant = all(element.type != 'IDENTIFIER' or element.value not in written
+                        for element in elements[start:end])
+        if invariant and (guaranteed or self.speculation_safe(elements[start:end])):
+            type = self.expression_type(elements, tree, types)
+            if type is not None:
+                spans.append((start, end, type))
+                return
+        operator = elements[left[1]].type
+        self.invariant_spans(elements, left, written,
+                             guaranteed, types, spans)
+        self.invariant_spans(elements, right, written,
+                             guaranteed and operator not in ('AND', 'OR'), types, spans)
+
+    def copy(self, ast, parent=None):
+        """ Return deep copy of the subtree
+        """
+        token = ast.name
+        node = Node(Token(token.line, token.type, token.value), parent=parent)
+        for child in ast.children:
+            self.copy(child, node)
+        return node
+
+    def hoist_invariants(self, variables, ast):
+        """ Move loop invariant expressions out of while loops into
+            temporaries declared in the scope of the loop. Expressions of
+            the condition are always evaluated, others which may fail are
+            computed under the original condition.
+            Returns names of created temporaries.
+        """
+        functions = self.functions(ast)
+        pure = self.pure_functions(variables, ast)
+        names = self.names(variables, ast)
+        hoisted = []
+        loops = [node for node in PostOrderIter(ast)
+                 if node is not ast and node.name.type == 'WHILE']
+        for loop in loops:
+            if not self.side_effect_free(loop.children[0], pure):
+                continue
+            scope = self.scope(loop)
+            types = self.types(variables, ast, scope)
+            body = loop.children[1]
+            written = self.writes(body)
+            found = [(loop.children[0], True)]
+            self.loop_expressions(body, all(node.name.type != 'RETURN'
+                                            for node in PreOrderIter(body)), found)
+            temporaries = {}
+            condition = self.copy(loop.children[0])
+            unguarded = []
+            assignments = []
+            guard = False
+            for expression, guaranteed in found:
+                if expression.name.type == 'RETURN_TYPE':
+                    callee = expression.children[0].name.value
+                    if not guaranteed or callee not in pure:
+                        continue
+                    type = functions[callee].children[1].name.type
+                    if type == 'NONE' or not self.invariant(expression.children[1:], written):
+                        continue
+                    nodes = [expression]
+                    spans = [(0, 1, type)]
+                else:
+                    elements = [node.name for node in expression.children]
+                    if len(elements) < 3:
+                        continue
+                    spans = []
+                    self.invariant_spans(elements, self.expression_tree(elements),
+                                         written, guaranteed, types, spans)
+                    if not spans:
+                        continue
+                    nodes = list(expression.children)
+                for start, end, type in reversed(spans):
+                    key = self.key(nodes[start:end])
+                    if key not in temporaries:
+                        temporaries[key] = self.temporary(names)
+                        variables.setdefault(scope, []).append(
+                            (temporaries[key], type))
+                        assignment = self.assignment(
+                            temporaries[key], nodes[start:end], loop.name.line)
+                        hoisted.append(temporaries[key])
+                        tokens = [node.name for node in PreOrderIter(
+                            assignment.children[1])]
+                        if expression is loop.children[0]:
+                            unguarded.append(assignment)
+                        else:
+                            assignments.append(assignment)
+                            guard = guard or tokens[0].type == 'RETURN_TYPE' or \
+                                not self.speculation_safe(tokens)
+                    nodes[start:end] = [Node(Token(nodes[start].name.line, 'IDENTIFIER',
+                                                   temporaries[key]))]
+                if expression.name.type == 'RETURN_TYPE':
+                    operation = Node(Token(expression.name.line, 'COLON'))
+                    nodes[0].parent = operation
+                    self.replace(expression, operation)
+                else:
+                    expression.children = nodes
+            if assignments and guard:
+                guard_ast = Node(Token(loop.name.line, 'IF'))
+                condition.parent = guard_ast
+                Node(Token(loop.name.line, 'COLON'),
+                     parent=guard_ast, children=assignments)
+                assignments = [guard_ast]
+            assignments = unguarded + assignments
+            if assignments:
+                siblings = list(loop.parent.children)
+                position = siblings.index(loop)
+                loop.parent.children = siblings[:position] + \
+                    assignments + siblings[position:]
+        return hoisted
+
+    def invariant(self, nodes, written):
+        """ Check if none of the operands is assigned in the loop
+        """
+        return all(node.name.type != 'IDENTIFIER' or node.name.value not in written
+                   for node in nodes)
+
+    def key(self, nodes):
+        """ Return hashable representation of the subtrees
+        """
+        return tuple((node.name.type, node.name.value, self.key(node.children))
+                     for node in nodes)
+
+    def assignment(self, name, nodes, line):
+        """ Return assignment of copied expression nodes to the variable
+        """
+        assignment = Node(Token(line, 'EQUALS'))
+        Node(Token(line, 'IDENTIFIER', name), parent=assignment)
+        if len(nodes) == 1 and nodes[0].name.type == 'RETURN_TYPE':
+            self.copy(nodes[0], assignment)
+        else:
+            operation = Node(Token(line, 'COLON'), parent=assignment)
+            for node in nodes:
+                self.copy(node, operation)
+        return assignment
+
+    def temporary(self, names, prefix='licm'):
+        """ Return new identifier not colliding with program names
+        """
+        number = 0
+        while f'{prefix}_{number}' in names:
+            number += 1
+        names.add(f'{prefix}_{number}')
+        return f'{prefix}_{number}'
+
+    def replace(self, old, new):
+        """ Put new node in place of old node in its parent
+        """
+        siblings = list(old.parent.children)
+        siblings[siblings.index(old)] = new
+        old.parent.children = siblings
+
+    def counted_step(self, loop):
+        """ Return increment statement of while loop in form
+            while i < bound: ... i = i + step or None if loop is not counted
+        """
+        condition = loop.children[0]
+        body = loop.children[1]
+        if condition.name.type != 'COLON' or not body.children:
+            return None
+        elements = [node.name for node in condition.children]
+        if len(elements) < 3 or elements[0].type != 'IDENTIFIER':
+            return None
+        if elements[1].type not in ('ISLESS', 'ISEQUALLESS', 'ISMORE', 'ISEQUALMORE'):
+            return None
+        if any(self.precedence.get(element.type, 5) <= 4 for element in elements[2:]):
+            return None
+        induction = elements[0].value
+        step = body.children[-1]
+        if step.name.type != 'EQUALS' or step.children[0].name.value != induction:
+            return None
+        if step.children[1].name.type != 'COLON':
+            return None
+        increment = [node.name for node in step.children[1].children]
+        if len(increment) != 3 or increment[0].type != 'IDENTIFIER' or increment[0].value != induction:
+            return None
+        if increment[1].type not in ('PLUS', 'MINUS'):
+            return None
+        if len([node for node in PreOrderIter(body) if node.name.type == 'EQUALS' and
+                node.children[0].name.value == induction]) != 1:
+            return None
+        written = self.writes(body)
+        if not self.invariant(list(condition.children[2:]) + [step.children[1].children[2]], written):
+            return None
+        return step
+
+    def counted_loops(self, variables, ast, openmp=False, shared=()):
+        """ Replace counted while loops with FOR nodes having children
+            init, condition, step and block. Init is an empty operation if
+            the loop is not directly preceded by assignment to the induction
+            variable. With openmp, value of the outermost FOR tokens that can
+            run in parallel holds OpenMP clauses. Calls to functions in shared
+            prevent parallelization. Returns lines of counted and parallel loops.
+        """
+        loops = [node for node in PostOrderIter(ast)
+                 if node is not ast and node.name.type == 'WHILE']
+        counted = []
+        for loop in loops:
+            step = self.counted_step(loop)
+            if step is None:
+                continue
+            line = loop.name.line
+            induction = step.children[0].name.value
+            siblings = list(loop.parent.children)
+            position = siblings.index(loop)
+            previous = siblings[position - 1] if position > 0 else None
+            if previous is not None and previous.name.type == 'EQUALS' and \
+                    previous.children[0].name.value == induction:
+                init = previous
+                siblings.pop(position - 1)
+            else:
+                init = Node(Token(line, 'COLON'))
+            condition, body = loop.children
+            step.parent = None
+            for_ast = Node(Token(line, 'FOR'))
+            for_ast.children = [init, condition, step, body]
+            siblings[siblings.index(loop)] = for_ast
+            loop.parent.children = siblings
+            counted.append(for_ast)
+        parallel = []
+        if openmp:
+            pure = self.pure_functions(variables, ast) - set(shared)
+            for for_ast in [node for node in PreOrderIter(ast) if node in counted]:
+                if any(ancestor in parallel for ancestor in for_ast.ancestors):
+                    continue
+                types = self.types(variables, ast, self.scope(for_ast))
+                clauses = self.parallel_clauses(for_ast, pure, types)
+                if clauses is not None:
+                    for_ast.name.value = clauses
+                    parallel.append(for_ast)
+        return [str(node.name.line) for node in counted], [str(node.name.line) for node in parallel]
+
+    def parallel_clauses(self, for_ast, pure, types):
+        """ Return OpenMP clauses for FOR node if its iterations are
+            independent, otherwise None. Variables written in the body must
+            be assigned before use in every iteration or be updated only as
+            sum or product accumulators. The induction variable is lastprivate
+            so it keeps its final value after the loop. Lastprivate variables
+            are unspecified after a loop without iterations, so init must be
+            safe to evaluate again in front of the condition guarding the loop.
+        """
+        init, condition, step, body = for_ast.children
+        induction = step.children[0].name.value
+        if init.name.type != 'EQUALS' or types.get(induction) != 'INT':
+            return None
+        if induction in self.reads(init) or not self.side_effect_free(init, pure):
+            return None
+        if any(node.name.type in ('PRINT', 'RETURN', 'DEF') for node in PreOrderIter(body)):
+            return None
+        if not self.side_effect_free(body, pure):
+            return None
+        seen = set()
+        defined = set()
+        for statement in body.children:
+            assignment = statement
+            if statement.name.type == 'FOR' and statement.children[0].name.type == 'EQUALS':
+                assignment = statement.children[0]
+            if assignment.name.type == 'EQUALS':
+                seen |= self.reads(assignment.children[1])
+                target = assignment.children[0].name.value
+                if target not in seen:
+                    defined.add(target)
+            seen |= self.reads(statement) | self.writes(statement)
+        reductions = {}
+        private = [induction]
+        for variable in sorted(self.writes(body) - {induction}):
+            if types.get(variable) not in ('INT', 'FLOAT', 'BOOL'):
+                return None
+            if variable in defined:
+                private.append(variable)
+                continue
+            operator = self.reduction_operator(body, variable)
+            if operator is None:
+                return None
+            reductions.setdefault(operator, []).append(variable)
+        clauses = [f'reduction({operator}:{",".join(names)})'
+                   for operator, names in reductions.items()]
+        clauses.append(f'lastprivate({",".join(private)})')
+        return ' '.join(clauses)
+
+    def reduction_operator(self, body, variable):
+        """ Return '+' or '*' if variable is only updated in the body as
+            variable = variable + expression or variable = variable * expression
+        """
+        operators = set()
+        updates = 0
+        for node in PreOrderIter(body):
+            if node.name.type != 'EQUALS' or node.children[0].name.value != variable:
+                continue
+            expression = node.children[1]
+            if expression.name.type != 'COLON' or len(expression.children) < 3:
+                return None
+            elements = [child.name for child in expression.children]
+            start, end, left, right = self.expression_tree(elements)
+            operator = elements[left[1]].type
+            if left[:2] != (0, 1) or elements[0].type != 'IDENTIFIER' or elements[0].value != variable:
+                return None
+            if operator not in ('PLUS', 'MULTIPLY'):
+                return None
+            operators.add('+' if operator == 'PLUS' else '*')
+            updates += 1
+        reads = len([node for node in PreOrderIter(body)
+                     if self.read(node) and node.name.value == variable])
+        if len(operators) != 1 or reads != updates:
+            return None
+        return operators.pop()
+
+    def cons(self, table, elements, tree):
+        """ Return hash-consed identifier of operation subtree. Structurally
+            equal subtrees get the same identifier.
+        """
+        start, end, left, right = tree
+        if left is None:
+            key = tuple((element.type, element.value)
+                        for element in elements[start:end])
+        else:
+            key = (elements[left[1]].type, self.cons(table, elements, left),
+                   self.cons(table, elements, right))
+        return table.setdefault(key, len(table))
+
+    def subexpressions(self, elements, tree, guaranteed, found):
+        """ Collect operation subtrees which are evaluated whenever the
+            operation is or which are safe to evaluate anyway
+        """
+        start, end, left, right = tree
+        if left is None:
+            return
+        if guaranteed or self.speculation_safe(elements[start:end]):
+            found.append(tree)
+        operator = elements[left[1]].type
+        self.subexpressions(elements, left, guaranteed, found)
+        self.subexpressions(elements, right, guaranteed and operator not in ('AND', 'OR'), found)
+
+    def basic_blocks(self, block):
+        """ Split statements of the block into straight line sequences.
+            Condition of if statement ends the sequence.
+        """
+        blocks = [[]]
+        for statement in block.children:
+            if statement.name.type in ('EQUALS', 'PRINT', 'RETURN', 'IF'):
+                blocks[-1].append(statement)
+            if statement.name.type not in ('EQUALS', 'PRINT', 'RETURN_TYPE'):
+                blocks.append([])
+        return [statements for statements in blocks if statements]
+
+    def statement_expressions(self, statement):
+        """ Return expressions evaluated by the statement of basic block
+        """
+        if statement.name.type == 'EQUALS':
+            return [statement.children[1]]
+        if statement.name.type == 'IF':
+            return [statement.children[0]]
+        return list(statement.children)
+
+    def common_subexpression(self, statements, table, types, pure, functions):
+        """ Return the largest expression computed more than once in the
+            basic block without change of its operands in between as
+            (size, occurrences, type). Occurrence is (statement, expression,
+            start, end) with start and end None for function calls.
+        """
+        available = {}
+        repeated = []
+        for statement in statements:
+            for expression in self.statement_expressions(statement):
+                if expression.name.type == 'RETURN_TYPE':
+                    callee = expression.children[0].name.value
+                    type = functions[callee].children[1].name.type if callee in functions else 'NONE'
+                    if callee not in pure or type == 'NONE':
+                        continue
+                    key = ('CALL',) + tuple((node.name.type, node.name.value)
+                                            for node in expression.children)
+                    operands = self.reads(expression)
+                    occurrence = (statement, expression, None, None)
+                    entry = available.setdefault(
+                        table.setdefault(key, len(table)), [len(expression.children), operands, type, []])
+                    entry[3].append(occurrence)
+                    continue
+                elements = [node.name for node in expression.children]
+                if len(elements) < 3:
+                    continue
+                found = []
+                self.subexpressions(elements, self.expression_tree(elements), True, found)
+                for tree in found:
+                    start, end = tree[:2]
+                    type = self.expression_type(elements, tree, types)
+                    if type is None:
+                        continue
+                    operands = {element.value for element in elements[start:end]
+                                if element.type == 'IDENTIFIER'}
+                    entry = available.setdefault(self.cons(table, elements, tree),
+                                                 [end - start, operands, type, []])
+                    entry[3].append((statement, expression, start, end))
+            if statement.name.type == 'EQUALS':
+                target = statement.children[0].name.value
+                for key in [key for key, entry in available.items() if target in entry[1]]:
+                    repeated.append(available.pop(key))
+        repeated.extend(available.values())
+        repeated = [(size, occurrences, type) for size, _, type, occurrences in repeated
+                    if len(occurrences) > 1]
+        if not repeated:
+            return None
+        return max(repeated, key=lambda entry: (entry[0], len(entry[1])))
+
+    def eliminate_common_subexpressions(self, variables, ast):
+        """ Compute expressions repeated inside basic blocks once into
+            temporaries declared in the scope of the block.
+            Returns names of created temporaries.
+        """
+        functions = self.functions(ast)
+        pure = self.pure_functions(variables, ast)
+        names = self.names(variables, ast)
+        table = {}
+        created = []
+        blocks = [ast] + [node for node in ast.descendants if node.name.type == 'COLON' and
+                          node.parent.name.type in ('DEF', 'WHILE', 'IF') and
+                          node.parent.children[0] is not node]
+        for block in blocks:
+            scope = self.scope(block)
+            types = self.types(variables, ast, scope)
+            for statements in self.basic_blocks(block):
+                while True:
+                    common = self.common_subexpression(
+                        statements, table, types, pure, functions)
+                    if common is None:
+                        break
+                    _, occurrences, type = common
+                    name = self.temporary(names, 'cse')
+                    variables.setdefault(scope, []).append((name, type))
+                    created.append(name)
+                    first, expression, start, end = occurrences[0]
+                    if start is None:
+                        nodes = [expression]
+                    else:
+                        nodes = list(expression.children)[start:end]
+                    assignment = self.assignment(name, nodes, first.name.line)
+                    statements.insert(statements.index(first), assignment)
+                    siblings = list(block.children)
+                    siblings.insert(siblings.index(first), assignment)
+                    block.children = siblings
+                    for _, expression, start, end in reversed(occurrences):
+                        identifier = Node(Token(expression.name.line, 'IDENTIFIER', name))
+                        if start is None:
+                            operation = Node(Token(expression.name.line, 'COLON'))
+                            identifier.parent = operation
+                            self.replace(expression, operation)
+                        else:
+                            children = list(expression.children)
+                            children[start:end] = [identifier]
+                            expression.children = children
+        return created
+
+    def call_graph(self, ast):
+        """ Return names of functions called by each top level function
+        """
+        return {name: self.callees(function.children[2])
+                for name, function in self.functions(ast).items()}
+
+    def recursive_functions(self, ast):
+        """ Return names of functions which can call themselves
+        """
+        graph = self.call_graph(ast)
+        recursive = set()
+        for name in graph:
+            visited = set()
+            stack = list(graph[name])
+            while stack:
+                callee = stack.pop()
+                if callee == name:
+                    recursive.add(name)
+                    break
+                if callee in visited or callee not in graph:
+                    continue
+                visited.add(callee)
+                stack.extend(graph[callee])
+        return recursive
+
+    def inline_functions(self, ast, limit, exclude=()):
+        """ Return names of non-recursive functions with at most limit
+            nodes in their definition
+        """
+        recursive = self.recursive_functions(ast)
+        return [name for name, function in self.functions(ast).items()
+                if name not in recursive and name not in exclude and
+                len(function.descendants) <= limit]
+
+    def single_expression(self, function):
+        """ Return expression of function whose body is a single return
+            statement or None
+        """
+        body = function.children[2]
+        if len(body.children) != 1 or body.children[0].name.type != 'RETURN':
+            return None
+        if not body.children[0].children or function.children[1].name.type == 'NONE':
+            return None
+        return body.children[0].children[0]
+
+    def substitute_calls(self, variables, ast, budget):
+        """ Replace calls of non-recursive single expression functions with
+            their expression with parameters renamed to arguments, while the
+            number of added nodes stays within budget.
+            Returns list of substituted calls.
+        """
+        functions = self.functions(ast)
+        recursive = self.recursive_functions(ast)
+        substituted = []
+        calls = [node for node in ast.descendants if node.name.type == 'RETURN_TYPE' and
+                 node.parent is not ast and
+                 node.parent.name.type in ('EQUALS', 'PRINT', 'RETURN', 'IF', 'WHILE')]
+        for call in calls:
+            callee = call.children[0].name.value
+            if callee not in functions or callee in recursive:
+                continue
+            function = functions[callee]
+            expression = self.single_expression(function)
+            if expression is None:
+                continue
+            params = self.params(function)
+            args = [node.name for node in call.children[1:]]
+            if len(params) != len(args):
+                continue
+            types = self.types(variables, ast, self.scope(call))
+            arg_types = [types.get(arg.value) if arg.type == 'IDENTIFIER'
+                         else arg.type[len('VALUE_'):] for arg in args]
+            if arg_types != [type for _, type in params]:
+                continue
+            return_type = function.children[1].name.type
+            if expression.name.type == 'RETURN_TYPE':
+                inner = expression.children[0].name.value
+                if inner not in functions or functions[inner].children[1].name.type != return_type:
+                    continue
+            else:
+                elements = [node.name for node in expression.children]
+                if self.expression_type(elements, self.expression_tree(elements),
+                                        dict(params)) != return_type:
+                    continue
+                if call.parent.name.type == 'PRINT' and \
+                        any(self.precedence.get(element.type, 5) <= 4 for element in elements):
+                    continue
+            growth = len(expression.descendants) - len(call.descendants)
+            if growth > budget:
+                continue
+            budget -= max(growth, 0)
+            renames = dict(zip([name for name, _ in params], args))
+            replacement = self.copy(expression)
+            for node in PreOrderIter(replacement):
+                node.name.line = call.name.line
+                if self.read(node) and node.name.value in renames:
+                    arg = renames[node.name.value]
+                    node.name = Token(call.name.line, arg.type, arg.value)
+            self.replace(call, replacement)
+            substituted.append(f'{callee} at line {call.name.line}')
+        return substituted
+
+    def interval(self, operator, left, right):
+        """ Return range of integer operation on operand ranges
+        """
+        if operator == 'PLUS':
+            return (left[0] + right[0], left[1] + right[1])
+        if operator == 'MINUS':
+            return (left[0] - right[1], left[1] - right[0])
+        if operator == 'MULTIPLY':
+            products = [a * b if 0 not in (a, b) else 0
+                        for a in left for b in right]
+            return (min(products), max(products))
+        magnitude = max(abs(left[0]), abs(left[1]))
+        if operator == 'DIVIDE':
+            if left[0] >= 0 and right[0] >= 0:
+                return (0, magnitude)
+            return (-magnitude, magnitude)
+        magnitude = min(magnitude, max(abs(right[0]), abs(right[1]), 1) - 1)
+        return (-magnitude if left[0] < 0 else 0, magnitude if left[1] > 0 else 0)
+
+    def evaluate(self, elements, tree, scope, kinds, ranges):
+        """ Return (type, range) of operation subtree. Range is None
+            for non integer values and for variables not assigned yet.
+        """
+        start, end, left, right = tree
+        if left is None:
+            element = elements[start]
+            if element.type == 'NOT':
+                return ('BOOL', (0, 1))
+            if element.type == 'IDENTIFIER':
+                return (kinds.get((scope, element.value)), ranges.get((scope, element.value)))
+            if element.type == 'VALUE_INT':
+                return ('INT', (element.value, element.value))
+            if element.type == 'VALUE_BOOL':
+                return ('BOOL', (0, 1))
+            return ('FLOAT', None)
+        operator = elements[left[1]].type
+        if self.precedence[operator] <= 4:
+            return ('BOOL', (0, 1))
+        left_kind, left_range = self.evaluate(
+            elements, left, scope, kinds, ranges)
+        right_kind, right_range = self.evaluate(
+            elements, right, scope, kinds, ranges)
+        if 'FLOAT' in (left_kind, right_kind):
+            return ('FLOAT', None)
+        if None in (left_kind, right_kind):
+            return (None, None)
+        if left_range is None or right_range is None:
+            return ('INT', None)
+        return ('INT', self.interval(operator, left_range, right_range))
+
+    def value(self, expression, scope, kinds, ranges):
+        """ Return (type, range) of expression node
+        """
+        if expression.name.type == 'RETURN_TYPE':
+            callee = expression.children[0].name.value
+            return (kinds.get((callee, None)), ranges.get((callee, None)))
+        elements = [node.name for node in expression.children]
+        if not elements:
+            return (None, None)
+        return self.evaluate(elements, self.expression_tree(elements), scope, kinds, ranges)
+
+    def step_range(self, step, scope, kinds, ranges):
+        """ Return range of induction variable after increment of counted
+            loop or None if the loop bound gives no information
+        """
+        assignment, condition = step
+        increment = [node.name for node in assignment.children[1].children]
+        elements = [node.name for node in condition.children]
+        induction = ranges.get((scope, increment[0].value))
+        kind, bound = self.evaluate(elements[2:], self.expression_tree(elements[2:]),
+                                    scope, kinds, ranges)
+        if induction is None or bound is None or increment[2].type != 'VALUE_INT' or increment[2].value <= 0:
+            return None
+        change = increment[2].value
+        if increment[1].type == 'PLUS' and elements[1].type in ('ISLESS', 'ISEQUALLESS'):
+            last = bound[1] - 1 if elements[1].type == 'ISLESS' else bound[1]
+            return (induction[0] + change, max(induction[0], last) + change)
+        if increment[1].type == 'MINUS' and elements[1].type in ('ISMORE', 'ISEQUALMORE'):
+            last = bound[0] + 1 if elements[1].type == 'ISMORE' else bound[0]
+            return (min(induction[1], last) - change, induction[1] - change)
+        return None
+
+    def infer_types(self, variables, ast):
+        """ Infer integer ranges of variables, parameters and function
+            results, declare variables assigned without annotation and cast
+            operations exceeding 32 bits. Returns dictionary of C++ types
+            keyed by (scope, name), with name None for function result,
+            and lines of operations which may overflow 64 bits.
+        """
+        functions = self.functions(ast)
+        kinds = {}
+        for scope, declared in variables.items():
+            for name, type in declared:
+                kinds[(scope, name)] = type
+        for name, function in functions.items():
+            for param, type in self.params(function):
+                kinds[(name, param)] = type
+            kinds[(name, None)] = function.children[1].name.type
+        annotated = set(kinds)
+        order = ('BOOL', 'INT', 'FLOAT')
+        steps = {}
+        for node in ast.descendants:
+            if node.name.type == 'WHILE' and self.counted_step(node) is not None:
+                steps[self.counted_step(node)] = (
+                    self.counted_step(node), node.children[0])
+            elif node.name.type == 'FOR':
+                steps[node.children[2]] = (node.children[2], node.children[1])
+        flows = []
+        for node in ast.descendants:
+            if node.name.type == 'EQUALS':
+                scope = self.scope(node)
+                flows.append(((scope, node.children[0].name.value), node.children[1],
+                              scope, steps.get(node)))
+            elif node.name.type == 'RETURN' and node.children and self.scope(node):
+                scope = self.scope(node)
+                flows.append(((scope, None), node.children[0], scope, None))
+            if node.name.type == 'RETURN_TYPE' and node.children[0].name.value in functions:
+                callee = functions[node.children[0].name.value]
+                for (param, _), arg in zip(self.params(callee), node.children[1:]):
+                    operation = Node(Token(arg.name.line, 'COLON'))
+                    Node(arg.name, parent=operation)
+                    flows.append(((callee.children[0].name.value, param), operation,
+                                  self.scope(node), None))
+        ranges = {}
+        changes = {}
+        changed = True
+        while changed:
+            changed = False
+            for target, expression, scope, step in flows:
+                kind, value = self.value(expression, scope, kinds, ranges)
+                if target not in annotated and kind is not None and (
+                        kinds.get(target) is None or kinds[target] in order and kind in order
+                        and order.index(kind) > order.index(kinds[target])):
+                    kinds[target] = kind
+                    changed = True
+                if kinds.get(target) not in ('INT', 'BOOL') or value is None:
+                    continue
+                if step is not None:
+                    value = self.step_range(step, scope, kinds, ranges) or value
+                old = ranges.get(target)
+                new = value if old is None else (
+                    min(old[0], value[0]), max(old[1], value[1]))
+                if new != old:
+                    changes[target] = changes.get(target, 0) + 1
+                    if changes[target] > 4 and old is not None:
+                        new = (-math.inf if new[0] < old[0] else new[0],
+                               math.inf if new[1] > old[1] else new[1])
+                    ranges[target] = new
+                    changed = True
+        types = {}
+        for target, kind in kinds.items():
+            if kind == 'FLOAT':
+                types[target] = 'double'
+            elif kind == 'BOOL':
+                types[target] = 'bool'
+            elif kind == 'INT':
+                types[target] = 'int64_t' if not self.fits(
+                    ranges.get(target), 32) else 'int32_t'
+        for (scope, name), kind in kinds.items():
+            declared = [variable[0] for variable in variables.get(scope, [])]
+            if scope:
+                declared += [param for param, _ in self.params(functions[scope])]
+            if name is not None and name not in declared:
+                variables.setdefault(scope, []).append((name, kind))
+        overflows = []
+        for node in ast.descendants:
+            if node.name.type == 'COLON' and node.children and \
+                    node.children[0].name.type in ('IDENTIFIER', 'NOT', 'VALUE_INT', 'VALUE_FLOAT', 'VALUE_BOOL'):
+                elements = [child.name for child in node.children]
+                casts = set()
+                self.widen(elements, self.expression_tree(elements), self.scope(node),
+                           kinds, ranges, types, casts, overflows)
+                children = list(node.children)
+                for position in sorted(casts, reverse=True):
+                    children.insert(position, Node(
+                        Token(elements[position].line, 'CAST', 'int64_t')))
+                node.children = children
+        return types, sorted(set(overflows))
+
+    def fits(self, value, bits):
+        """ Check if range is within signed integer of given size
+        """
+        return value is None or (-2 ** (bits - 1) <= value[0] and value[1] < 2 ** (bits - 1))
+
+    def widen(self, elements, tree, scope, kinds, ranges, types, casts, overflows):
+        """ Return size in bits of C++ integer in which operation subtree is
+            computed, collecting positions where cast to 64 bits is needed
+            to compute it without overflow and lines of 64 bit overflows.
+            Operations on already unbounded values are reported only for
+            multiplication, others are usually imprecision of recursion.
+        """
+        start, end, left, right = tree
+        if left is None:
+            if elements[start].type == 'IDENTIFIER':
+                return 64 if types.get((scope, elements[start].value)) == 'int64_t' else 32
+            if elements[start].type == 'VALUE_INT':
+                return 32 if self.fits((elements[start].value, elements[start].value), 32) else 64
+            return 32
+        bits = max(self.widen(elements, left, scope, kinds, ranges, types, casts, overflows),
+                   self.widen(elements, right, scope, kinds, ranges, types, casts, overflows))
+        kind, value = self.evaluate(elements, tree, scope, kinds, ranges)
+        if kind != 'INT' or self.fits(value, 32):
+            return bits
+        operands = (self.evaluate(elements, left, scope, kinds, ranges)[1],
+                    self.evaluate(elements, right, scope, kinds, ranges)[1])
+        if not self.fits(value, 64) and (elements[left[1]].type == 'MULTIPLY' or
+                                         all(self.fits(operand, 64) for operand in operands)):
+            overflows.append(str(elements[start].line))
+        if bits == 32:
+            casts.add(start)
+        return 64
+
+    def constant(self, elements, tree):
+        """ Return (type, value) of operation subtree of literals computed
+            with C++ semantics, or None if it is not constant or folding
+            would change the result (division by zero, int overflow)
+        """
+        start, end, left, right = tree
+        if left is None:
+            if elements[start].type == 'NOT':
+                operand = self.constant(elements, (start + 1, end, None, None))
+                return None if operand is None else ('BOOL', not operand[1])
+            if elements[start].type.startswith('VALUE_'):
+                return (elements[start].type[len('VALUE_'):], elements[start].value)
+            return None
+        operator = elements[left[1]].type
+        operands = (self.constant(elements, left), self.constant(elements, right))
+        if None in operands:
+            return None
+        (left_type, a), (right_type, b) = operands
+        if operator == 'AND':
+            return ('BOOL', bool(a) and bool(b))
+        if operator == 'OR':
+            return ('BOOL', bool(a) or bool(b))
+        if self.precedence[operator] <= 4:
+            return ('BOOL', {'ISEQUAL': a == b, 'ISNOTEQUAL': a != b, 'ISLESS': a < b,
+                             'ISEQUALLESS': a <= b, 'ISMORE': a > b, 'ISEQUALMORE': a >= b}[operator])
+        if 'FLOAT' in (left_type, right_type):
+            a, b = float(a), float(b)
+            if operator == 'MODULO' or (operator == 'DIVIDE' and b == 0):
+                return None
+            value = {'PLUS': a + b, 'MINUS': a - b, 'MULTIPLY': a * b,
+                     'DIVIDE': a / b if b else 0}[operator]
+            return ('FLOAT', value) if math.isfinite(value) else None
+        a, b = int(a), int(b)
+        if operator in ('DIVIDE', 'MODULO'):
+            if b == 0:
+                return None
+            quotient = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+            value = quotient if operator == 'DIVIDE' else a - b * quotient
+        else:
+            value = {'PLUS': a + b, 'MINUS': a - b, 'MULTIPLY': a * b}[operator]
+        return ('INT', value) if self.fits((value, value), 32) else None
+
+    def constant_spans(self, elements, tree, spans):
+        """ Collect (start, end, type, value) of largest constant subtrees
+            which are not a single literal
+        """
+        start, end, left, right = tree
+        value = self.constant(elements, tree)
+        if value is not None and end - start > 1:
+            spans.append((start, end) + value)
+        elif left is not None:
+            self.constant_spans(elements, left, spans)
+            self.constant_spans(elements, right, spans)
+
+    def fold_constants(self, ast):
+        """ Replace constant parts of operations with their values.
+            Folded conditions become int literals 1 or 0, which C++
+            converts the same way as bool values. Returns lines of
+            folded operations.
+        """
+        folded = []
+        for node in ast.descendants:
+            if node.name.type != 'COLON' or not node.children or \
+                    node.children[0].name.type not in ('IDENTIFIER', 'NOT', 'VALUE_INT', 'VALUE_FLOAT', 'VALUE_BOOL'):
+                continue
+            elements = [child.name for child in node.children]
+            spans = []
+            self.constant_spans(elements, self.expression_tree(elements), spans)
+            children = list(node.children)
+            for start, end, type, value in reversed(spans):
+                if type == 'BOOL':
+                    type, value = 'INT', int(value)
+                children[start:end] = [
+                    Node(Token(elements[start].line, 'VALUE_' + type, value))]
+            if spans:
+                node.children = children
+                folded.append(str(node.name.line))
+        return folded
+
+    def condition_value(self, condition):
+        """ Return truth value of constant condition or None
+        """
+        if condition.name.type != 'COLON' or len(condition.children) != 1:
+            return None
+        token = condition.children[0].name
+        if not token.type.startswith('VALUE_'):
+            return None
+        return bool(token.value)
+
+    def splice(self, old, nodes):
+        """ Replace node with list of nodes in its parent
+        """
+        children = list(old.parent.children)
+        position = children.index(old)
+        old.parent.children = children[:position] + \
+            list(nodes) + children[position + 1:]
+
+    def prune_branches(self, ast):
+        """ Remove branches of if statements with constant conditions
+            and while loops with false condition. Returns removed
+            statements as type and line.
+        """
+        pruned = []
+        for node in [node for node in PostOrderIter(ast) if node is not ast and
+                     node.name.type in ('IF', 'WHILE')]:
+            value = self.condition_value(node.children[0])
+            if value is None:
+                continue
+            elif_branch = node.parent is not ast and node.parent.name.type == 'IF'
+            if node.name.type == 'WHILE':
+                if value:
+                    continue
+                replacement = []
+            elif value:
+                replacement = [node.children[1]] if elif_branch else node.children[1].children
+            elif len(node.children) < 3:
+                replacement = []
+            elif node.children[2].name.type == 'IF' or elif_branch:
+                replacement = [node.children[2]]
+            else:
+                replacement = node.children[2].children
+            pruned.append(f'{"elif" if elif_branch else node.name.type.lower()} at line {node.name.line}')
+            self.splice(node, replacement)
+        return pruned
+
+    def unused_variables(self, variables, ast):
+        """ Remove declarations of variables never read in their scope
+            together with their assignments, if these have no side
+            effects. Returns removed names.
+        """
+        pure = self.pure_functions(variables, ast)
+        removed = []
+        changed = True
+        while changed:
+            changed = False
+            reads = set()
+            stores = {}
+            for node in ast.descendants:
+                if self.read(node):
+                    reads.add((self.scope(node), node.name.value))
+                elif node.name.type == 'EQUALS':
+                    stores.setdefault((self.scope(node), node.children[0].name.value), []).append(node)
+            for scope, declared in variables.items():
+                for variable in list(declared):
+                    assignments = stores.get((scope, variable[0]), [])
+                    if (scope, variable[0]) in reads or any(
+                            not self.side_effect_free(assignment.children[1], pure)
+                            for assignment in assignments):
+                        continue
+                    for assignment in assignments:
+                        assignment.parent = None
+                    declared.remove(variable)
+                    if variable[0] not in removed:
+                        removed.append(variable[0])
+                    changed = True
+        return removed
@@ -31,28 +31,82 @@ from transpiler.lexer import *
 
 
 class ParserError(Exception):
-    """ Contains unrecognized syntax token
+    """ Contains unrecognized syntax token, its line
+        and sorted types of tokens expected instead
     """
 
-    def __init__(self, token):
+    def __init__(self, token, expected=()):
         self.token = token
+        self.line = token.line
+        self.expected = tuple(sorted(expected))
+        message = f'line {self.line}: unexpected token {token}'
+        if self.expected:
+            message += f', expected {", ".join(self.expected)}'
+        super().__init__(message)
 
 
 class Parser:
+    def __init__(self, recover=False):
+        """ In recover mode syntax errors are collected in errors and
+            parsing continues from the next statement
+        """
+        self.recover = recover
+        self.errors = []
+        self.declared = {}
+        self.statements = ('DEF', 'IDENTIFIER', 'IF', 'PRINT', 'RETURN', 'WHILE')
+        self.types = ('BOOL', 'FLOAT', 'INT')
+        self.operands = ('IDENTIFIER', 'VALUE_BOOL', 'VALUE_FLOAT', 'VALUE_INT')
+
     def parse(self, tokens):
         ast = Node('Program')
         variables = {}
         scope = ''
         token = None
+        self.errors = []
+        self.declared = {}
         while True:
             try:
-                token = self.statement(tokens, ast, variables, scope, token)
-                if token is not None and token.type == 'DEDENT':
-                    raise ParserError(token)
+                try:
+                    token = self.statement(tokens, ast, variables, scope, token)
+                    if token is not None and token.type == 'DEDENT':
+                        raise self.error(token, *self.statements)
+                except ParserError as pe:
+                    token = self.synchronize(tokens, pe)
+                    if token is not None and token.type == 'DEDENT':
+                        token = None
             except StopIteration:
                 break
         return variables, ast
 
+    def error(self, token, *expected):
+        return ParserError(token, expected)
+
+    def synchronize(self, tokens, error):
+        """ Record error and skip tokens to the end of the statement,
+            including its nested blocks and else or elif branches.
+            Returns NEWLINE or DEDENT token ending the statement,
+            or first token of the next statement. Raises error if
+            not in recover mode.
+        """
+        if not self.recover:
+            raise error
+        self.errors.append(error)
+        token = error.token
+        depth = 0
+        while True:
+            if token.type == 'INDENT':
+                depth += 1
+            elif token.type == 'DEDENT' and depth > 1:
+                depth -= 1
+            elif token.type == 'DEDENT' and depth == 1:
+                token = next(tokens)
+                depth = 0
+                if token.type not in ('ELSE', 'ELIF'):
+                    return token
+            elif token.type in ('NEWLINE', 'DEDENT') and depth == 0:
+                return token
+            token = next(tokens)
+
     def statement(self, tokens, ast, variables, scope, token=None):
         if token is None:
             token = next(tokens)
@@ -63,12 +117,12 @@ class Parser:
             if token2.type == 'COLON':
                 token2 = next(tokens)
                 if not self.type(token2.type):
-                    raise ParserError(token2)
+                    raise self.error(token2, *self.types)
                 if scope not in variables:
                     variables[scope] = []
-                for variable in variables[scope]:
-                    if token.value == variable[0] and token2.type != variable[1]:
-                        raise ParserError(token)
+                declared = self.declared.setdefault((scope, token.value), token2.type)
+                if token2.type != declared:
+                    raise self.error(token, declared)
                 variables[scope].append((token.value, token2.type))
                 token2 = next(tokens)
                 if token2.type != 'EQUALS':
@@ -81,7 +135,7 @@ class Parser:
                 func_call_ast = Node(Token(token.line, 'RETURN_TYPE'), parent=ast)
                 Node(token, parent=func_call_ast)
                 return self.func_call_statement(tokens, func_call_ast, variables, scope)
-            raise ParserError(token)
+            raise self.error(token, 'COLON', 'EQUALS', 'LP')
         if token.type == 'DEF':
             sub_ast = Node(token, parent=ast)
             new_scope = scope
@@ -105,22 +159,22 @@ class Parser:
                 tokens, sub_ast, variables, scope)
         if token.type == 'DEDENT':
             return token
-        raise ParserError(token)
+        raise self.error(token, *self.statements)
 
     def func_call_statement(self, tokens, ast, variables, scope):
         token = next(tokens)
         if token.type == 'RP':
             return next(tokens)
         if not self.value(token.type) and token.type != 'IDENTIFIER':
-            raise ParserError(token)
+            raise self.error(token, 'RP', *self.operands)
         Node(token, parent=ast)
         token = next(tokens)
         while token.type != 'RP':
             if token.type != 'COMMA':
-                raise ParserError(token)
+                raise self.error(token, 'COMMA', 'RP')
             token = next(tokens)
             if not self.value(token.type) and token.type != 'IDENTIFIER':
-                raise ParserError(token)
+                raise self.error(token, *self.operands)
             Node(token, parent=ast)
             token = next(tokens)
         return next(tokens)
@@ -128,55 +182,55 @@ class Parser:
     def function_statement(self, tokens, def_ast, variables, scope):
         token = next(tokens)
         if token.type != 'IDENTIFIER':
-            raise ParserError(token)
+            raise self.error(token, 'IDENTIFIER')
         scope = token.value
         func_ast = Node(token, parent=def_ast)
         token = next(tokens)
         if token.type != 'LP':
-            raise ParserError(token)
+            raise self.error(token, 'LP')
         token = next(tokens)
         while token.type != 'RP':
             if token.type != 'IDENTIFIER':
-                raise ParserError(token)
+                raise self.error(token, 'IDENTIFIER', 'RP')
             arg_ast = Node(token, parent=func_ast)
             token = next(tokens)
             if token.type != 'COLON':
-                raise ParserError(token)
+                raise self.error(token, 'COLON')
             token = next(tokens)
             if not self.type(token.type):
-                raise ParserError(token)
+                raise self.error(token, *self.types)
             Node(token, parent=arg_ast)
             token = next(tokens)
             if token.type != 'COMMA' and token.type != 'RP':
-                raise ParserError(token)
+                raise self.error(token, 'COMMA', 'RP')
             if token.type == 'COMMA':
                 token = next(tokens)
                 if token.type == 'RP':
-                    raise ParserError(token)
+                    raise self.error(token, 'IDENTIFIER')
         token = next(tokens)
         if token.type != 'RETURN_TYPE':
-            raise ParserError(token)
+            raise self.error(token, 'RETURN_TYPE')
         token = next(tokens)
         if token.type != 'NONE' and not self.type(token.type):
-            raise ParserError(token)
+            raise self.error(token, 'NONE', *self.types)
         Node(token, parent=def_ast)
         token = next(tokens)
         if token.type != 'COLON':
-            raise ParserError(token)
+            raise self.error(token, 'COLON')
         block_ast = Node(token, parent=def_ast)
         return self.statement_block(tokens, block_ast, variables, scope)
 
     def while_statement(self, tokens, while_ast, variables, scope):
         token = self.expression_statement(tokens, while_ast, variables, scope)
         if token.type != 'COLON':
-            raise ParserError(token)
+            raise self.error(token, 'COLON')
         block_ast = Node(token, parent=while_ast)
         return self.statement_block(tokens, block_ast, variables, scope)
 
     def if_statement(self, tokens, if_ast, variables, scope):
         token = self.expression_statement(tokens, if_ast, variables, scope)
         if token.type != 'COLON':
-            raise ParserError(token)
+            raise self.error(token, 'COLON')
         block_ast = Node(token, parent=if_ast)
         self.statement_block(tokens, block_ast, variables, scope)
         token = next(tokens)
@@ -190,28 +244,31 @@ class Parser:
     def else_statement(self, tokens, else_ast, variables, scope):
         token = next(tokens)
         if token.type != 'COLON':
-            raise ParserError(token)
+            raise self.error(token, 'COLON')
         block_ast = Node(token, parent=else_ast)
         return self.statement_block(tokens, block_ast, variables, scope)
 
     def print_statement(self, tokens, print_ast, variables, scope):
         token = next(tokens)
         if token.type != 'LP':
-            raise ParserError(token)
+            raise self.error(token, 'LP')
         while token.type != 'RP':
             token = self.expression_statement(
                 tokens, print_ast, variables, scope)
             if token.type != 'COMMA' and token.type != 'RP':
-                raise ParserError(token)
+                raise self.error(token, 'COMMA', 'RP')
         return next(tokens)
 
     def statement_block(self, tokens, ast, variables, scope):
         token = next(tokens)
         if token.type != 'INDENT':
-            raise ParserError(token)
-        token = self.statement(tokens, ast, variables, scope)
+            raise self.error(token, 'INDENT')
+        token = None
         while token is None or token.type != 'DEDENT':
-            token = self.statement(tokens, ast, variables, scope, token)
+            try:
+                token = self.statement(tokens, ast, variables, scope, token)
+            except ParserError as pe:
+                token = self.synchronize(tokens, pe)
         return None
 
     def expression_statement(self, tokens, ast, variables, scope):
@@ -226,7 +283,7 @@ class Parser:
         operation_ast = Node(Token(token.line, type='COLON'), parent=ast)
         Node(token, parent=operation_ast)
         if token.type == 'NOT' and token2.type != 'IDENTIFIER' and not self.value(token2.type):
-            raise ParserError(token2)
+            raise self.error(token2, *self.operands)
         elif token.type == 'NOT' and (token2.type == 'IDENTIFIER' or self.value(token2.type)):
             token = next(tokens)
             Node(token2, parent=operation_ast)
@@ -240,7 +297,7 @@ class Parser:
         while True:
             token = next(tokens)
             if token.type != 'IDENTIFIER' and not self.value(token.type):
-                raise ParserError(token)
+                raise self.error(token, *self.operands)
             Node(token, parent=operation_ast)
             token = next(tokens)
             if not self.binary_op(token.type) and not self.binary_logic_op(token.type) and not self.comparison_op(token.type):
@@ -263,6 +320,194 @@ class Parser:
         return (token_type == 'PLUS' or token_type == 'MINUS' or token_type == 'MULTIPLY' or token_type == 'DIVIDE' or token_type == 'MODULO')
 
 
+class Recognizer:
+    """ Checks if tokens from Lexer.scan match the grammar and declarations
+        do not conflict, raising the same errors as Parser.parse,
+        without building the tree
+    """
+
+    def __init__(self):
+        self.values = {'VALUE_INT', 'VALUE_FLOAT', 'VALUE_BOOL'}
+        self.types = {'INT', 'FLOAT', 'BOOL'}
+        self.operators = {'PLUS', 'MINUS', 'MULTIPLY', 'DIVIDE', 'MODULO', 'AND', 'OR', 'ISEQUAL',
+                          'ISNOTEQUAL', 'ISLESS', 'ISEQUALLESS', 'ISMORE', 'ISEQUALMORE'}
+        self.operands = self.values | {'IDENTIFIER'}
+
+    def check(self, buffer):
+        """ Raise LexerError or ParserError if buffer is not a valid program
+        """
+        lexer = Lexer()
+        lexer.input(buffer)
+        self.recognize(lexer.scan())
+
+    def recognize(self, tokens):
+        variables = {}
+        token = None
+        while True:
+            try:
+                token = self.statement(tokens, variables, '', token)
+                if token is not None and token[0] == 'DEDENT':
+                    self.error(token)
+            except StopIteration:
+                break
+
+    def error(self, token):
+        raise ParserError(Token(token[2], token[0], token[1]))
+
+    def statement(self, tokens, variables, scope, token=None):
+        if token is None:
+            token = next(tokens)
+        while token[0] == 'NEWLINE':
+            token = next(tokens)
+        type = token[0]
+        if type == 'IDENTIFIER':
+            token2 = next(tokens)
+            if token2[0] == 'COLON':
+                token2 = next(tokens)
+                if token2[0] not in self.types:
+                    self.error(token2)
+                declared = variables.setdefault(scope, {})
+                if declared.setdefault(token[1], token2[0]) != token2[0]:
+                    self.error(token)
+                token2 = next(tokens)
+                if token2[0] != 'EQUALS':
+                    return token2
+            if token2[0] == 'EQUALS':
+                return self.expression_statement(tokens)
+            if token2[0] == 'LP':
+                return self.func_call_statement(tokens)
+            self.error(token)
+        if type == 'DEF':
+            return self.function_statement(tokens, variables)
+        if type == 'WHILE' or type == 'IF':
+            token = self.expression_statement(tokens)
+            if token[0] != 'COLON':
+                self.error(token)
+            self.statement_block(tokens, variables, scope)
+            if type == 'WHILE':
+                return None
+            return self.if_tail(tokens, variables, scope)
+        if type == 'PRINT':
+            return self.print_statement(tokens)
+        if type == 'RETURN':
+            return self.expression_statement(tokens)
+        if type == 'DEDENT':
+            return token
+        self.error(token)
+
+    def func_call_statement(self, tokens):
+        token = next(tokens)
+        if token[0] == 'RP':
+            return next(tokens)
+        if token[0] not in self.operands:
+            self.error(token)
+        token = next(tokens)
+        while token[0] != 'RP':
+            if token[0] != 'COMMA':
+                self.error(token)
+            token = next(tokens)
+            if token[0] not in self.operands:
+                self.error(token)
+            token = next(tokens)
+        return next(tokens)
+
+    def function_statement(self, tokens, variables):
+        token = next(tokens)
+        if token[0] != 'IDENTIFIER':
+            self.error(token)
+        scope = token[1]
+        token = next(tokens)
+        if token[0] != 'LP':
+            self.error(token)
+        token = next(tokens)
+        while token[0] != 'RP':
+            if token[0] != 'IDENTIFIER':
+                self.error(token)
+            token = next(tokens)
+            if token[0] != 'COLON':
+                self.error(token)
+            token = next(tokens)
+            if token[0] not in self.types:
+                self.error(token)
+            token = next(tokens)
+            if token[0] != 'COMMA' and token[0] != 'RP':
+                self.error(token)
+            if token[0] == 'COMMA':
+                token = next(tokens)
+                if token[0] == 'RP':
+                    self.error(token)
+        token = next(tokens)
+        if token[0] != 'RETURN_TYPE':
+            self.error(token)
+        token = next(tokens)
+        if token[0] != 'NONE' and token[0] not in self.types:
+            self.error(token)
+        token = next(tokens)
+        if token[0] != 'COLON':
+            self.error(token)
+        return self.statement_block(tokens, variables, scope)
+
+    def if_tail(self, tokens, variables, scope):
+        token = next(tokens)
+        if token[0] == 'ELSE':
+            token = next(tokens)
+            if token[0] != 'COLON':
+                self.error(token)
+            return self.statement_block(tokens, variables, scope)
+        if token[0] == 'ELIF':
+            token = self.expression_statement(tokens)
+            if token[0] != 'COLON':
+                self.error(token)
+            self.statement_block(tokens, variables, scope)
+            return self.if_tail(tokens, variables, scope)
+        return token
+
+    def print_statement(self, tokens):
+        token = next(tokens)
+        if token[0] != 'LP':
+            self.error(token)
+        while token[0] != 'RP':
+            token = self.expression_statement(tokens)
+            if token[0] != 'COMMA' and token[0] != 'RP':
+                self.error(token)
+        return next(tokens)
+
+    def statement_block(self, tokens, variables, scope):
+        token = next(tokens)
+        if token[0] != 'INDENT':
+            self.error(token)
+        token = self.statement(tokens, variables, scope)
+        while token is None or token[0] != 'DEDENT':
+            token = self.statement(tokens, variables, scope, token)
+        return None
+
+    def expression_statement(self, tokens):
+        token = next(tokens)
+        type = token[0]
+        if type != 'NOT' and type not in self.operands:
+            return token
+        token2 = next(tokens)
+        if type == 'IDENTIFIER' and token2[0] == 'LP':
+            return self.func_call_statement(tokens)
+        if type == 'NOT':
+            if token2[0] not in self.operands:
+                self.error(token2)
+            token = next(tokens)
+            if token[0] not in self.operators:
+                return token
+        elif token2[0] not in self.operators:
+            return token2
+        operands = self.operands
+        operators = self.operators
+        while True:
+            token = next(tokens)
+            if token[0] not in operands:
+                self.error(token)
+            token = next(tokens)
+            if token[0] not in operators:
+                return token
+
+
 if __name__ == '__main__':
     if len(sys.argv) != 2:
         print(f'Usage: python {sys.argv[0]} <input file path>')